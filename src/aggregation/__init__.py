@@ -0,0 +1 @@
+# This file marks the aggregation directory as a Python package.
\ No newline at end of file
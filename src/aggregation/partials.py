@@ -0,0 +1,190 @@
+from typing import Dict, Iterable, List, Tuple
+from collections import Counter
+import gzip
+import json
+import os
+import tempfile
+
+
+PARTIAL_FORMAT = 'gdex-partial'
+PARTIAL_VERSION = 2
+
+
+def _offer(counts: Dict, key, count: int, first: Tuple[int, int]) -> None:
+    if key in counts:
+        entry = counts[key]
+        entry[0] += count
+        entry[1] = min(entry[1], first)
+    else:
+        counts[key] = [count, first]
+
+
+def _new_lemma_entry() -> Dict:
+    return {'matches': {}, 'cooccurrences': {}, 'bigrams': {}}
+
+
+def build_partial(extractor, lemmas: List[str], sentences: List[str], offset: int = 0,
+                  lemmatizer=None, window_size: int = 5) -> Dict:
+    """Per-shard statistics for `sentences`, which start at corpus index `offset`.
+
+    Every counted key remembers where it was first seen (sentence index,
+    order within that sentence), so merged counters can be rebuilt in the
+    same order a single pass over the whole corpus would have produced.
+
+    With a lemmatizer, each candidate sentence is tagged once for all lemmas
+    and the tags of matched sentences are kept in `annotations`, so later
+    steps (e.g. sense collocations) can reuse them instead of re-tagging.
+    """
+    partial = {
+        'params': {'window_size': window_size, 'lemmatizer': lemmatizer is not None},
+        'ranges': [[offset, offset + len(sentences)]] if sentences else [],
+        'lemmas': {},
+        'annotations': {},
+    }
+    tagged = {}
+
+    def matches(lemma, sentence_id, sentence):
+        if lemmatizer is None:
+            return extractor.sentence_has_lemma(lemma, sentence)
+        if lemma not in sentence:
+            return False
+        if sentence_id not in tagged:
+            tagged[sentence_id] = [[list(word) for word in words] for words in lemmatizer.annotate(sentence)]
+        return any(word[1] == lemma for words in tagged[sentence_id] for word in words)
+
+    for lemma in lemmas:
+        entry = _new_lemma_entry()
+        for i, sentence in enumerate(sentences):
+            sentence_id = offset + i
+            if not matches(lemma, sentence_id, sentence):
+                continue
+            if sentence_id in tagged:
+                partial['annotations'][sentence_id] = tagged[sentence_id]
+            entry['matches'][sentence_id] = sentence
+            counted = extractor.count_cooccurrences(lemma, [sentence], window_size)
+            for position, (word, count) in enumerate(counted.items()):
+                _offer(entry['cooccurrences'], word, count, (sentence_id, position))
+            counted = extractor.count_bigrams(lemma, [sentence])
+            for position, (bigram, count) in enumerate(counted.items()):
+                _offer(entry['bigrams'], bigram, count, (sentence_id, position))
+        partial['lemmas'][lemma] = entry
+
+    return partial
+
+
+def merge_partials(partials: Iterable[Dict]) -> Dict:
+    """Merge partial results. The merge is associative and commutative;
+    overlapping corpus ranges or mismatched parameters raise ValueError.
+    Senses from `reduce --senses` cannot be merged and are dropped."""
+    merged = None
+    for partial in partials:
+        if merged is None:
+            merged = {'params': dict(partial['params']), 'ranges': [], 'lemmas': {}, 'annotations': {}}
+        elif partial['params'] != merged['params']:
+            raise ValueError(f"Cannot merge partials built with {partial['params']} and {merged['params']}")
+
+        for start, end in partial['ranges']:
+            for other_start, other_end in merged['ranges']:
+                if start < other_end and other_start < end:
+                    raise ValueError(f"Corpus range [{start}, {end}) overlaps [{other_start}, {other_end})")
+            merged['ranges'].append([start, end])
+        merged['annotations'].update(partial['annotations'])
+
+        for lemma, entry in partial['lemmas'].items():
+            target = merged['lemmas'].setdefault(lemma, _new_lemma_entry())
+            target['matches'].update(entry['matches'])
+            for field in ('cooccurrences', 'bigrams'):
+                for key, (count, first) in entry[field].items():
+                    _offer(target[field], key, count, tuple(first))
+
+    if merged is None:
+        raise ValueError("No partial results to merge")
+    merged['ranges'].sort()
+    return merged
+
+
+def _ordered_counter(counts: Dict) -> Counter:
+    return Counter({key: count for key, (count, _) in sorted(counts.items(), key=lambda x: x[1][1])})
+
+
+def apply_partial(partial: Dict, extractor) -> None:
+    """Load a (merged) partial into a CooccurrenceExtractor's state."""
+    for lemma, entry in partial['lemmas'].items():
+        extractor.lemma_sentences[lemma] = [entry['matches'][i] for i in sorted(entry['matches'])]
+        extractor.cooccurrences[lemma] = _ordered_counter(entry['cooccurrences'])
+        extractor.bigrams[lemma] = _ordered_counter(entry['bigrams'])
+
+
+def sentence_annotations(partial: Dict) -> Dict[str, list]:
+    """Stored annotations keyed by sentence text, as `WsdHandler` expects them."""
+    annotations = {}
+    for entry in partial['lemmas'].values():
+        for sentence_id, sentence in entry['matches'].items():
+            if sentence_id in partial['annotations']:
+                annotations[sentence] = partial['annotations'][sentence_id]
+    return annotations
+
+
+def corpus_size(partial: Dict) -> int:
+    return sum(end - start for start, end in partial['ranges'])
+
+
+def save_partial(partial: Dict, path: str) -> None:
+    payload = {
+        'format': PARTIAL_FORMAT,
+        'version': PARTIAL_VERSION,
+        'params': partial['params'],
+        'ranges': partial['ranges'],
+        'lemmas': {
+            lemma: {
+                'matches': [[i, sentence] for i, sentence in sorted(entry['matches'].items())],
+                'cooccurrences': [[word, count, *first] for word, (count, first) in entry['cooccurrences'].items()],
+                'bigrams': [[w1, w2, count, *first] for (w1, w2), (count, first) in entry['bigrams'].items()],
+            }
+            for lemma, entry in partial['lemmas'].items()
+        },
+        'annotations': [[i, words] for i, words in sorted(partial['annotations'].items())],
+    }
+    if 'senses' in partial:
+        payload['senses'] = {
+            lemma: [{'sense_id': int(sense['sense_id']), 'examples': list(sense['examples']),
+                     'collocations': {word: int(count) for word, count in sense['collocations'].items()},
+                     'count': int(sense['count'])}
+                    for sense in senses]
+            for lemma, senses in partial['senses'].items()
+        }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            f.write(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_partial(path: str) -> Dict:
+    with gzip.open(path, 'rb') as f:
+        payload = json.loads(f.read().decode('utf-8'))
+    if payload.get('format') != PARTIAL_FORMAT:
+        raise ValueError(f"{path} is not a GDEX partial result")
+    if payload.get('version') != PARTIAL_VERSION:
+        raise ValueError(f"Unsupported partial result version: {payload.get('version')}")
+
+    lemmas = {}
+    for lemma, entry in payload['lemmas'].items():
+        lemmas[lemma] = {
+            'matches': {i: sentence for i, sentence in entry['matches']},
+            'cooccurrences': {word: [count, (sid, pos)] for word, count, sid, pos in entry['cooccurrences']},
+            'bigrams': {(w1, w2): [count, (sid, pos)] for w1, w2, count, sid, pos in entry['bigrams']},
+        }
+    annotations = {i: words for i, words in payload['annotations']}
+    partial = {'params': payload['params'], 'ranges': payload['ranges'], 'lemmas': lemmas,
+               'annotations': annotations}
+    if 'senses' in payload:
+        partial['senses'] = payload['senses']
+    return partial
@@ -1,4 +1,4 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from collections import Counter, defaultdict
 import re
 from tqdm import tqdm
@@ -11,70 +11,85 @@ class CooccurrenceExtractor:
         self.corpus_path = corpus_path
         self.cooccurrences = defaultdict(Counter)
         self.lemma_sentences = defaultdict(list)
+        self.bigrams = defaultdict(Counter)
 
-    def load_corpus(self, corpus_path: str = None, max_lines: int = None) -> List[str]:
+    def iter_corpus(self, corpus_path: str = None, max_lines: int = None,
+                    progress: bool = False) -> Iterator[str]:
+        """Yield corpus sentences one at a time; `load_corpus` is the list form."""
         if corpus_path:
             self.corpus_path = corpus_path
         
         if not self.corpus_path:
-            return []
+            return
         
+        with open(self.corpus_path, 'r', encoding='utf-8') as f:
+            iterator = enumerate(f)
+            if progress and max_lines:
+                iterator = tqdm(iterator, total=max_lines, desc="Loading corpus", ncols=80, unit=" lines")
+            
+            for i, line in iterator:
+                if max_lines and i >= max_lines:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                if '\t' in line:
+                    parts = line.split('\t', 1)
+                    if len(parts) == 2:
+                        yield parts[1].strip('"')
+                else:
+                    yield line
+
+    def load_corpus(self, corpus_path: str = None, max_lines: int = None) -> List[str]:
         try:
-            sentences = []
-            with open(self.corpus_path, 'r', encoding='utf-8') as f:
-                iterator = enumerate(f)
-                if max_lines:
-                    iterator = tqdm(iterator, total=max_lines, desc="Loading corpus", ncols=80, unit=" lines")
-                
-                for i, line in iterator:
-                    if max_lines and i >= max_lines:
-                        break
-                    line = line.strip()
-                    if not line:
-                        continue
-                    if '\t' in line:
-                        parts = line.split('\t', 1)
-                        if len(parts) == 2:
-                            sentence = parts[1].strip('"')
-                            sentences.append(sentence)
-                    else:
-                        sentences.append(line)
-            return sentences
+            return list(self.iter_corpus(corpus_path, max_lines, progress=True))
         except FileNotFoundError:
             return []
 
+    @staticmethod
+    def sentence_has_lemma(lemma: str, sentence: str, lemmatizer=None) -> bool:
+        if lemmatizer:
+            if lemma not in sentence:
+                return False
+            return lemma in lemmatizer.get_lemmas_only(sentence)
+        words = sentence.split()
+        return lemma in words or any(lemma in word for word in words)
+
+    def iter_sentences_with_lemma(self, lemma: str, sentences: Iterable[str],
+                                  lemmatizer=None, yield_misses: bool = False) -> Iterator[Optional[str]]:
+        """Yield matching sentences; with `yield_misses`, yield None for each
+        sentence that does not match so a consumer can stop between them."""
+        for sentence in sentences:
+            if self.sentence_has_lemma(lemma, sentence, lemmatizer):
+                yield sentence
+            elif yield_misses:
+                yield None
+
     def extract_sentences_with_lemma(self, lemma: str, sentences: List[str], 
-                                     lemmatizer=None, n_jobs: int = 1) -> List[str]:
+                                     lemmatizer=None, n_jobs: int = 1, progress: bool = True) -> List[str]:
         matching_sentences = []
         
         if lemmatizer:
-            print(f"   Lemmatizing {len(sentences):,} sentences with {n_jobs} jobs...")
+            if progress:
+                print(f"   Lemmatizing {len(sentences):,} sentences with {n_jobs} jobs...")
             
             batch_size = max(100, len(sentences) // (n_jobs * 4))
             batches = [sentences[i:i+batch_size] for i in range(0, len(sentences), batch_size)]
             
-            for batch in tqdm(batches, desc="Searching", ncols=80, unit=" batch"):
-                for sentence in batch:
-                    if lemma not in sentence:
-                        continue
-                    lemmas = lemmatizer.get_lemmas_only(sentence)
-                    if lemma in lemmas:
-                        matching_sentences.append(sentence)
+            for batch in tqdm(batches, desc="Searching", ncols=80, unit=" batch", disable=not progress):
+                matching_sentences.extend(self.iter_sentences_with_lemma(lemma, batch, lemmatizer))
         else:
-            print(f"   Searching {len(sentences):,} sentences (simple match)...")
-            for sentence in tqdm(sentences, desc="Searching", ncols=80, unit=" sent"):
-                words = sentence.split()
-                if lemma in words or any(lemma in word for word in words):
-                    matching_sentences.append(sentence)
+            if progress:
+                print(f"   Searching {len(sentences):,} sentences (simple match)...")
+            iterator = tqdm(sentences, desc="Searching", ncols=80, unit=" sent", disable=not progress)
+            matching_sentences.extend(self.iter_sentences_with_lemma(lemma, iterator))
         
         self.lemma_sentences[lemma] = matching_sentences
         return matching_sentences
 
-    def extract_cooccurrences(self, lemma: str, sentences: List[str] = None, 
-                             window_size: int = 5) -> Dict[str, int]:
-        if sentences is None:
-            sentences = self.lemma_sentences.get(lemma, [])
-        
+    @staticmethod
+    def count_cooccurrences(lemma: str, sentences: List[str], 
+                            window_size: int = 5) -> Counter:
         cooccurrences = Counter()
         
         for sentence in sentences:
@@ -86,7 +101,14 @@ class CooccurrenceExtractor:
                     end_index = min(len(tokens), i + window_size + 1)
                     context = tokens[start_index:i] + tokens[i + 1:end_index]
                     cooccurrences.update(context)
+        return cooccurrences
+
+    def extract_cooccurrences(self, lemma: str, sentences: List[str] = None, 
+                             window_size: int = 5) -> Dict[str, int]:
+        if sentences is None:
+            sentences = self.lemma_sentences.get(lemma, [])
         
+        cooccurrences = self.count_cooccurrences(lemma, sentences, window_size)
         self.cooccurrences[lemma] = cooccurrences
         return dict(cooccurrences)
 
@@ -100,11 +122,7 @@ class CooccurrenceExtractor:
             return self.cooccurrences[lemma].most_common(n)
         return []
 
-    def extract_collocations(self, lemma: str, sentences: List[str] = None,
-                            min_frequency: int = 2) -> List[Tuple[str, str, int]]:
-        if sentences is None:
-            sentences = self.lemma_sentences.get(lemma, [])
-        
+    def count_bigrams(self, lemma: str, sentences: List[str]) -> Counter:
         bigrams = Counter()
         
         for sentence in sentences:
@@ -115,7 +133,17 @@ class CooccurrenceExtractor:
                         bigrams[(tokens[i-1], token)] += 1
                     if i < len(tokens) - 1:
                         bigrams[(token, tokens[i+1])] += 1
+        return bigrams
+
+    def extract_collocations(self, lemma: str, sentences: List[str] = None,
+                            min_frequency: int = 2) -> List[Tuple[str, str, int]]:
+        if sentences is None:
+            sentences = self.lemma_sentences.get(lemma, [])
         
-        filtered = [(w1, w2, count) for (w1, w2), count in bigrams.items() 
+        self.bigrams[lemma] = self.count_bigrams(lemma, sentences)
+        return self.get_collocations(lemma, min_frequency)
+
+    def get_collocations(self, lemma: str, min_frequency: int = 2) -> List[Tuple[str, str, int]]:
+        filtered = [(w1, w2, count) for (w1, w2), count in self.bigrams.get(lemma, {}).items() 
                    if count >= min_frequency]
-        return sorted(filtered, key=lambda x: x[2], reverse=True)
\ No newline at end of file
+        return sorted(filtered, key=lambda x: x[2], reverse=True)
@@ -0,0 +1,79 @@
+from aggregation.partials import (apply_partial, build_partial, corpus_size, load_partial,
+                                  merge_partials, save_partial, sentence_annotations)
+from collocations.cooccurrence_extractor import CooccurrenceExtractor
+from pipeline.config import DEFAULT_CONFIG_PATH, load_pipeline_config
+import argparse
+import itertools
+
+
+def map_shard(config_path: str, shard: str, out: str):
+    index, count = (int(part) for part in shard.split('/'))
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{shard}', expected INDEX/COUNT with 0 <= INDEX < COUNT")
+    config = load_pipeline_config(config_path)
+
+    # Shards are contiguous ranges of the sentences `load_corpus` would return.
+    # A counting pass fixes the bounds; only this shard's slice is kept.
+    extractor = CooccurrenceExtractor()
+    corpus = config['corpus']
+    total = sum(1 for _ in extractor.iter_corpus(corpus['path'], max_lines=corpus['max_lines']))
+    start = index * total // count
+    end = (index + 1) * total // count
+    sentences = list(itertools.islice(extractor.iter_corpus(max_lines=corpus['max_lines']), start, end))
+
+    lemmatizer = None
+    if config['match']['use_lemmatizer']:
+        from lemmatizer.hebrew_lemmatizer import HebrewLemmatizer
+        lemmatizer = HebrewLemmatizer(download_model=False)
+
+    partial = build_partial(extractor, config['lemmas'], sentences, offset=start,
+                            lemmatizer=lemmatizer,
+                            window_size=config['collocate']['cooccurrence_window'])
+    save_partial(partial, out)
+    print(f"Shard {index}/{count}: sentences [{start}, {end}) -> {out}")
+
+
+def reduce_partials(paths, out: str, senses: bool = False):
+    merged = merge_partials(load_partial(path) for path in paths)
+
+    extractor = CooccurrenceExtractor()
+    apply_partial(merged, extractor)
+    for lemma, matches in extractor.lemma_sentences.items():
+        top = extractor.get_top_cooccurrences(lemma, n=5)
+        print(f"  {lemma}: {len(matches)} matches - {top}")
+
+    if senses:
+        from sense_disambiguation.wsd_handler import WsdHandler
+        wsd_handler = WsdHandler()
+        annotations = sentence_annotations(merged)
+        merged['senses'] = {}
+        for lemma, matches in extractor.lemma_sentences.items():
+            if matches:
+                merged['senses'][lemma] = wsd_handler.generate_senses(lemma, matches, annotations=annotations)
+                print(f"  {lemma}: {len(merged['senses'][lemma])} senses")
+
+    save_partial(merged, out)
+    print(f"Merged {len(paths)} partials covering {corpus_size(merged):,} sentences -> {out}")
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hebrew GDEX - sharded corpus statistics")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    map_parser = subparsers.add_parser('map', help="Build the partial result for one corpus shard")
+    map_parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="Path to YAML config")
+    map_parser.add_argument('--shard', required=True, help="Shard to process, as INDEX/COUNT")
+    map_parser.add_argument('--out', required=True, help="Partial result file to write")
+
+    reduce_parser = subparsers.add_parser('reduce', help="Merge partial results")
+    reduce_parser.add_argument('partials', nargs='+', help="Partial result files")
+    reduce_parser.add_argument('--out', required=True, help="Merged partial result file to write")
+    reduce_parser.add_argument('--senses', action='store_true',
+                               help="Cluster the merged matches into senses and store them in the output")
+
+    args = parser.parse_args()
+    if args.command == 'map':
+        map_shard(args.config, args.shard, args.out)
+    else:
+        reduce_partials(args.partials, args.out, senses=args.senses)
@@ -1,12 +1,26 @@
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Iterable, Optional, Tuple
 import re
-from collections import Counter
+import time
+import heapq
+from collections import Counter, defaultdict
+
+
+PARALLEL_SCORING_CHUNK = 2000
+
+
+def _score_chunk(weights: Dict[str, float], lemma: str, sentences: List[str],
+                 shared_common_words) -> List[float]:
+    scorer = GdexScorer()
+    scorer.weights = weights
+    common_words = shared_common_words.get()
+    return [scorer.score_sentence(sentence, lemma, common_words) for sentence in sentences]
 
 
 class GdexScorer:
-    def __init__(self, cooccurrence_extractor=None, wsd_handler=None):
+    def __init__(self, cooccurrence_extractor=None, wsd_handler=None, scheduler=None):
         self.cooccurrence_extractor = cooccurrence_extractor
         self.wsd_handler = wsd_handler
+        self.scheduler = scheduler
         
         self.weights = {
             'length': 0.2,
@@ -55,27 +69,46 @@ class GdexScorer:
         total_score = sum(scores[k] * self.weights[k] for k in self.weights)
         return total_score
 
-    def score_examples(self, sentences: List[str], lemma: str) -> List[Tuple[str, float]]:
+    @staticmethod
+    def _common_words(sentences: List[str]) -> set:
         all_words = []
         for sent in sentences:
             all_words.extend(sent.split())
         word_freq = Counter(all_words)
-        common_words = {word for word, count in word_freq.items() if count >= 2}
+        return {word for word, count in word_freq.items() if count >= 2}
+
+    def score_examples(self, sentences: List[str], lemma: str) -> List[Tuple[str, float]]:
+        common_words = self._common_words(sentences)
         
         scored = []
-        for sentence in sentences:
-            score = self.score_sentence(sentence, lemma, common_words)
-            scored.append((sentence, score))
+        if self.scheduler is not None and self.scheduler.parallel and len(sentences) > PARALLEL_SCORING_CHUNK:
+            shared_common_words = self.scheduler.share(common_words)
+            chunks = [sentences[i:i + PARALLEL_SCORING_CHUNK]
+                      for i in range(0, len(sentences), PARALLEL_SCORING_CHUNK)]
+            try:
+                chunk_scores = self.scheduler.map(
+                    _score_chunk, [(dict(self.weights), lemma, chunk, shared_common_words) for chunk in chunks]
+                )
+            finally:
+                self.scheduler.unshare(shared_common_words)
+            for chunk, scores in zip(chunks, chunk_scores):
+                scored.extend(zip(chunk, scores))
+        else:
+            for sentence in sentences:
+                score = self.score_sentence(sentence, lemma, common_words)
+                scored.append((sentence, score))
         
         scored.sort(key=lambda x: x[1], reverse=True)
         return scored
 
     def generate_examples(self, lemma: str, sentences: List[str], 
-                         top_n: int = 10, diversity: bool = True) -> List[Dict]:
+                         top_n: int = 10, diversity: bool = True,
+                         sense_clusters: Dict[int, List[str]] = None) -> List[Dict]:
         scored_sentences = self.score_examples(sentences, lemma)
         
-        if diversity and self.wsd_handler:
-            sense_clusters = self.wsd_handler.disambiguate(lemma, sentences)
+        if diversity and (sense_clusters or self.wsd_handler):
+            if not sense_clusters:
+                sense_clusters = self.wsd_handler.disambiguate(lemma, sentences)
             
             examples = []
             for cluster_id, cluster_sentences in sense_clusters.items():
@@ -102,6 +135,108 @@ class GdexScorer:
         
         return examples
 
+    def generate_examples_streaming(self, lemma: str, candidates: Iterable[Optional[str]],
+                                    top_n: int = 10, diversity: bool = True,
+                                    score_threshold: float = 0.8, time_budget: float = None,
+                                    warmup: int = 200, batch_size: int = 64,
+                                    on_candidate: Callable[[str], None] = None,
+                                    n_clusters: int = None) -> Dict:
+        """Anytime top-k selection; returns examples, clusters and whether the stream was exhausted.
+        `None` candidates are scanned non-matches that only give the deadline a chance to stop."""
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+        candidates = iter(candidates)
+        seen = set()
+        exhausted = False
+
+        def out_of_time():
+            return deadline is not None and time.monotonic() >= deadline
+
+        def next_batch(size):
+            nonlocal exhausted
+            batch = []
+            for sentence in candidates:
+                # Same whitespace normalisation as the full-mode dedupe stage.
+                normalized = None if sentence is None else ' '.join(sentence.split())
+                if normalized is not None and normalized not in seen:
+                    seen.add(normalized)
+                    if on_candidate is not None:
+                        on_candidate(sentence)
+                    batch.append(sentence)
+                if len(batch) >= size or out_of_time():
+                    return batch
+            exhausted = True
+            return batch
+
+        warm = next_batch(warmup)
+        common_words = self._common_words(warm)
+        if diversity and self.wsd_handler:
+            assigner = self.wsd_handler.build_sense_assigner(lemma, warm, n_clusters=n_clusters)
+            n_clusters = assigner.n_clusters
+            assign = assigner.assign
+        else:
+            n_clusters = 1
+            assign = lambda batch: [0] * len(batch)
+
+        n_per_cluster = max(1, top_n // n_clusters)
+        cluster_heaps = defaultdict(list)
+        overflow_heap = []
+        counter = 0
+
+        def offer(batch):
+            nonlocal counter
+            if not batch:
+                return
+            for sentence, cluster_id in zip(batch, assign(batch)):
+                entry = (self.score_sentence(sentence, lemma, common_words), -counter, sentence)
+                counter += 1
+                for heap, size in ((cluster_heaps[cluster_id], n_per_cluster), (overflow_heap, top_n)):
+                    if len(heap) < size:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+
+        def satisfied():
+            if len(cluster_heaps) < n_clusters:
+                return False
+            return all(len(heap) >= n_per_cluster and heap[0][0] >= score_threshold
+                       for heap in cluster_heaps.values())
+
+        offer(warm)
+        while not exhausted:
+            if satisfied():
+                stop_reason = 'threshold'
+                break
+            if out_of_time():
+                stop_reason = 'time_budget'
+                break
+            offer(next_batch(batch_size))
+        else:
+            stop_reason = 'exhausted'
+
+        sense_clusters = {}
+        examples = []
+        for cluster_id in sorted(cluster_heaps):
+            ranked = sorted(cluster_heaps[cluster_id], reverse=True)
+            sense_clusters[cluster_id] = [sentence for _, _, sentence in ranked]
+            examples.extend({'sentence': sentence, 'score': score, 'sense_cluster': cluster_id, 'lemma': lemma}
+                            for score, _, sentence in ranked)
+
+        if len(examples) < top_n:
+            chosen = {ex['sentence'] for ex in examples}
+            overflow_id = -1 if diversity and self.wsd_handler else 0
+            remaining = [{'sentence': sentence, 'score': score, 'sense_cluster': overflow_id, 'lemma': lemma}
+                         for score, _, sentence in sorted(overflow_heap, reverse=True)
+                         if sentence not in chosen]
+            examples.extend(remaining[:top_n - len(examples)])
+
+        return {
+            'examples': examples,
+            'sense_clusters': sense_clusters,
+            'candidates_seen': len(seen),
+            'final': exhausted,
+            'stop_reason': stop_reason,
+        }
+
     def filter_by_quality(self, sentences: List[str], lemma: str, 
                          min_score: float = 0.5) -> List[str]:
         scored = self.score_examples(sentences, lemma)
@@ -1,5 +1,6 @@
 import stanza
 from typing import List, Dict, Tuple
+import threading
 import torch
 
 
@@ -16,23 +17,33 @@ class HebrewLemmatizer:
             use_gpu=False,
             verbose=False
         )
+        # The Stanza pipeline is not safe to call from several threads at once.
+        self._lock = threading.Lock()
+
+    def _parse(self, text: str):
+        with self._lock:
+            return self.nlp(text)
 
     def lemmatize(self, word: str) -> str:
-        doc = self.nlp(word)
+        doc = self._parse(word)
         if doc.sentences and doc.sentences[0].words:
             return doc.sentences[0].words[0].lemma
         return word
 
     def lemmatize_sentence(self, sentence: str) -> List[Tuple[str, str]]:
-        doc = self.nlp(sentence)
+        doc = self._parse(sentence)
         result = []
         for sent in doc.sentences:
             for word in sent.words:
                 result.append((word.text, word.lemma))
         return result
 
+    def annotate(self, sentence: str) -> List[List[Tuple[str, str, str]]]:
+        doc = self._parse(sentence)
+        return [[(word.text, word.lemma, word.upos) for word in sent.words] for sent in doc.sentences]
+
     def get_lemmas_only(self, sentence: str) -> List[str]:
-        doc = self.nlp(sentence)
+        doc = self._parse(sentence)
         lemmas = []
         for sent in doc.sentences:
             for word in sent.words:
@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+import json
+import os
+import sqlite3
+import tempfile
+
+
+STORE_VERSION = 1
+
+
+def compile_store(records: Iterable[Dict], path: str) -> int:
+    """Compile GDEX records into a read-only SQLite store at `path`.
+
+    Each lemma is stored once as a JSON entry under its primary key; when
+    a lemma appears more than once the last record wins. The store is built
+    in a temporary file and moved into place, so readers never see a
+    half-written store.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+
+    try:
+        conn = sqlite3.connect(tmp_path)
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE entries (lemma TEXT PRIMARY KEY, entry TEXT NOT NULL) WITHOUT ROWID")
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries (lemma, entry) VALUES (?, ?)",
+            ((r['lemma'], json.dumps(r, ensure_ascii=False, separators=(',', ':'))) for r in records)
+        )
+        count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ('version', str(STORE_VERSION)),
+            ('created', datetime.now().strftime("%Y%m%d_%H%M%S")),
+            ('lemmas', str(count)),
+        ])
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+class GdexStore:
+    """Read-only lookups into a store built by `compile_store`."""
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.execute("PRAGMA query_only=1")
+        self.meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if int(self.meta.get('version', 0)) != STORE_VERSION:
+            raise ValueError(f"Unsupported store version: {self.meta.get('version')}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __contains__(self, lemma: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM entries WHERE lemma = ?", (lemma,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return int(self.meta['lemmas'])
+
+    def lemmas(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT lemma FROM entries ORDER BY lemma")]
+
+    def get(self, lemma: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT entry FROM entries WHERE lemma = ?", (lemma,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def examples(self, lemma: str, sense_cluster: int = None) -> List[Dict]:
+        entry = self.get(lemma)
+        if entry is None:
+            return []
+        if sense_cluster is None:
+            return entry['examples']
+        return [ex for ex in entry['examples'] if ex['sense_cluster'] == sense_cluster]
+
+    def clusters(self, lemma: str) -> Dict[str, Dict]:
+        entry = self.get(lemma)
+        return entry['clusters'] if entry else {}
+
+    def collocations(self, lemma: str, cluster_id: int) -> Dict[str, int]:
+        cluster = self.clusters(lemma).get(str(cluster_id))
+        return cluster['top_collocations'] if cluster else {}
+
+    def cooccurrences(self, lemma: str) -> Dict[str, int]:
+        entry = self.get(lemma)
+        return entry['top_cooccurrences'] if entry else {}
+
+    def close(self) -> None:
+        self.conn.close()
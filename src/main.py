@@ -2,170 +2,106 @@ from lemmatizer.hebrew_lemmatizer import HebrewLemmatizer
 from sense_disambiguation.wsd_handler import WsdHandler
 from collocations.cooccurrence_extractor import CooccurrenceExtractor
 from example_generator.gdex_scorer import GdexScorer
-import os
-import multiprocessing as mp
-from tqdm import tqdm
-import json
-from datetime import datetime
-
-
-def main():
-    corpus_path = os.path.join('data', 'heb_news_2020_1M', 'heb_news_2020_1M-sentences.txt')
-    target_lemma = 'נקודה'
-    max_corpus_lines = 50000
-    
-    cores = mp.cpu_count()
-    n_jobs = max(1, cores - 1) if cores > 2 else 1
-    
-    print("\nHebrew GDEX - Dictionary Example Generation\n")
-    
-    lemmatizer = HebrewLemmatizer(download_model=False)
-    cooccurrence_extractor = CooccurrenceExtractor(corpus_path)
-    wsd_handler = WsdHandler(corpus_path)
-    gdex_scorer = GdexScorer(cooccurrence_extractor, wsd_handler)
-    
-    print(f"Loading corpus (using {n_jobs} cores)...")
-    if os.path.exists(corpus_path):
-        sentences = cooccurrence_extractor.load_corpus(max_lines=max_corpus_lines)
+from lookup.gdex_store import compile_store
+from pipeline.checkpoints import CheckpointStore
+from pipeline.config import DEFAULT_CONFIG_PATH, load_pipeline_config
+from pipeline.scheduler import TaskScheduler, limit_threads
+from pipeline.stages import Components, StageContext, build_pipeline
+from writers.legacy import LegacyWriter, iter_legacy_records, render_text_files
+from writers.sharded import ShardedRecordSink, load_records
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+
+
+def open_sink(output_config):
+    if output_config['format'] == 'legacy':
+        return LegacyWriter(output_config['dir'])
+    return ShardedRecordSink(output_config['records_dir'], fmt=output_config['format'],
+                             records_per_shard=output_config['records_per_shard'])
+
+
+def render(config_path: str = DEFAULT_CONFIG_PATH, lemma: str = None):
+    config = load_pipeline_config(config_path)
+    output = config['output']
+    text_files = render_text_files(output['records_dir'], output['dir'], [lemma] if lemma else None)
+    print(f"Rendered {len(text_files)} TXT reports to {output['dir']}")
+
+
+def export_store(config_path: str = DEFAULT_CONFIG_PATH):
+    config = load_pipeline_config(config_path)
+    output = config['output']
+    if output['format'] == 'legacy':
+        records = iter_legacy_records(output['dir'])
     else:
-        print("No corpus found - using sample sentences")
-        sentences = [
-            "העלה נקודה מאוד מעניינת בוויכוח הזה על העתיד של החינוך.",
-            "הם שברו שיוויון בדקה התשעים שהבקיעו עוד גול וזכו בנקודה נוספת.",
-            "נקודה חשובה שצריך לזכור היא שהחינוך משתנה עם הזמן.",
-            "הקבוצה צברה נקודה בלבד במשחק האחרון נגד היריבה.",
-            "זו נקודה מעניינת שראוי להעלות בדיון הבא.",
-            "הם הפסידו נקודה חשובה במאבק על המקום הראשון.",
-            "נקודה נוספת לדיון היא השפעת הטכנולוגיה על החברה.",
-            "הבקיעו גול וקיבלו נקודה אחת בטבלה.",
-        ]
-    print(f"Loaded {len(sentences):,} sentences\n")
-    
-    print(f"Finding sentences with '{target_lemma}'...")
-    matching_sentences = cooccurrence_extractor.extract_sentences_with_lemma(
-        target_lemma, sentences, lemmatizer, n_jobs=n_jobs
-    )
-    print(f"Found {len(matching_sentences)} matches\n")
-    
-    if not matching_sentences:
-        print(f"No examples found for '{target_lemma}'")
-        return
-    
-    print("Clustering by sense...")
-    sense_clusters = wsd_handler.disambiguate(target_lemma, matching_sentences)
-    print(f"Identified {len(sense_clusters)} clusters:")
-    
-    # Extract cluster-specific collocations with TF-IDF filtering
-    cluster_collocations = wsd_handler.extract_cluster_specific_collocations(
-        target_lemma, sense_clusters, window=4
-    )
-    
-    for cluster_id, cluster_sents in sense_clusters.items():
-        top_patterns = list(cluster_collocations[cluster_id].items())[:5]
-        print(f"  Cluster {cluster_id}: {len(cluster_sents)} sentences - {top_patterns}")
-    
-    print("\nExtracting co-occurrences...")
-    cooccurrences = cooccurrence_extractor.extract_cooccurrences(target_lemma, matching_sentences)
-    top_cooccurrences = cooccurrence_extractor.get_top_cooccurrences(target_lemma, n=10)
-    print("Top co-occurring words:")
-    for word, count in top_cooccurrences:
-        print(f"  {word}: {count}")
-    
-    print("\nGenerating examples...")
-    num_examples = 20
-    examples = gdex_scorer.generate_examples(
-        target_lemma, 
-        matching_sentences, 
-        top_n=num_examples,
-        diversity=True
+        records = load_records(output['records_dir']).values()
+    count = compile_store(records, config['store']['path'])
+    print(f"Exported {count} lemmas to {config['store']['path']}")
+
+
+def main(config_path: str = DEFAULT_CONFIG_PATH, lemma: str = None, fresh: bool = False):
+    config = load_pipeline_config(config_path, {'lemma': lemma} if lemma else None)
+
+    print("\nHebrew GDEX - Dictionary Example Generation\n")
+
+    scheduler = TaskScheduler(config['runtime']['cores'])
+    cooccurrence_extractor = CooccurrenceExtractor(config['corpus']['path'])
+    wsd_handler = WsdHandler(config['corpus']['path'], scheduler=scheduler)
+    gdex_scorer = GdexScorer(cooccurrence_extractor, wsd_handler, scheduler=scheduler)
+    components = Components(
+        cooccurrence_extractor, wsd_handler, gdex_scorer,
+        sink=open_sink(config['output']),
+        lemmatizer_factory=lambda: HebrewLemmatizer(download_model=False),
+        scheduler=scheduler
     )
-    
-    print(f"\nTop {len(examples)} examples:\n")
-    for i, example in enumerate(examples, 1):
-        print(f"{i}. [score: {example['score']:.2f}, cluster: {example['sense_cluster']}]")
-        print(f"   {example['sentence']}\n")
-    
-    print("Saving results...")
-    output_dir = "output"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(output_dir, f"gdex_results_{target_lemma}_{timestamp}.json")
-    
-    results = {
-        "lemma": target_lemma,
-        "timestamp": timestamp,
-        "corpus_size": int(len(sentences)),
-        "matching_sentences_count": int(len(matching_sentences)),
-        "n_clusters": int(len(sense_clusters)),
-        "clusters": {},
-        "top_cooccurrences": {k: int(v) for k, v in top_cooccurrences},
-        "examples": [
-            {
-                "sentence": ex["sentence"],
-                "score": float(ex["score"]),
-                "sense_cluster": int(ex["sense_cluster"]),
-                "lemma": ex["lemma"]
-            }
-            for ex in examples
-        ]
-    }
-    
-    for cluster_id, cluster_sents in sense_clusters.items():
-        patterns = cluster_collocations[cluster_id]
-        results["clusters"][str(cluster_id)] = {
-            "size": int(len(cluster_sents)),
-            "top_collocations": {k: int(v) for k, v in list(patterns.items())[:10]}
-        }
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    
-    text_file = os.path.join(output_dir, f"gdex_results_{target_lemma}_{timestamp}.txt")
-    with open(text_file, 'w', encoding='utf-8') as f:
-        f.write(f"תוצאות GDEX עבור: {target_lemma}\n")
-        f.write(f"נוצר ב: {datetime.now().strftime('%d/%m/%Y %H:%M')}\n")
-        f.write("=" * 80 + "\n\n")
-        
-        f.write(f"גודל קורפוס: {len(sentences):,} משפטים\n")
-        f.write(f"משפטים עם '{target_lemma}': {len(matching_sentences)}\n")
-        f.write(f"מספר אשכולות משמעות: {len(sense_clusters)}\n\n")
-        f.write("=" * 80 + "\n\n")
-        
-        for cluster_id, cluster_sents in sorted(sense_clusters.items()):
-            patterns = cluster_collocations[cluster_id]
-            top_collocations = ", ".join([f"{word} ({count})" for word, count in list(patterns.items())[:8]])
-            
-            f.write(f"אשכול {cluster_id}\n")
-            f.write(f"גודל: {len(cluster_sents)} משפטים\n")
-            f.write(f"קולוקציות: {top_collocations}\n")
-            f.write("\nדוגמאות:\n\n")
-            
-            for i, sent in enumerate(cluster_sents[:5], 1):
-                f.write(f"{i}. {sent}\n\n")
-            
-            if len(cluster_sents) > 5:
-                f.write(f"(ועוד {len(cluster_sents) - 5} משפטים נוספים)\n")
-            
-            f.write("\n" + "-" * 80 + "\n\n")
-        
-        f.write("=" * 80 + "\n")
-        f.write("מילים נפוצות לצד הלמה\n")
-        f.write("=" * 80 + "\n\n")
-        for word, count in top_cooccurrences:
-            f.write(f"{word:20} {count}\n")
-        
-        f.write("\n" + "=" * 80 + "\n")
-        f.write("דוגמאות מובילות (לפי ציון GDEX)\n")
-        f.write("=" * 80 + "\n\n")
-        
-        for i, example in enumerate(examples, 1):
-            f.write(f"[{i}] ציון: {example['score']:.2f} | אשכול: {example['sense_cluster']}\n")
-            f.write(f"{example['sentence']}\n\n")
-    
-    print(f"Saved to {output_file}")
-    print(f"        {text_file}\n")
+
+    store = CheckpointStore(config['checkpoints']['dir'], enabled=config['checkpoints']['enabled'])
+    if fresh:
+        store.clear()
+    pipeline = build_pipeline(store, config, parallel=scheduler.parallel)
+
+    lemmas = config['lemmas']
+    parallel_lemmas, threads_per_lemma = 1, None
+    if scheduler.parallel:
+        # Lemma threads do their in-process work (tagging, TF-IDF, KMeans, scoring) on cores
+        # reserved from the scheduler budget; by default they get half of it, the pool the rest.
+        parallel_lemmas = config['runtime']['parallel_lemmas'] or max(1, scheduler.cores // 2)
+        parallel_lemmas = max(1, min(len(lemmas), parallel_lemmas, scheduler.cores - 1))
+        threads_per_lemma = max(1, scheduler.cores // (2 * parallel_lemmas))
+        limit_threads(threads_per_lemma)
+
+    def run_lemma(target_lemma, corpus):
+        context = StageContext(target_lemma, config, components, n_jobs=scheduler.cores,
+                               progress=parallel_lemmas == 1)
+        with scheduler.reserve(threads_per_lemma or 1):
+            pipeline.run(context, preloaded=corpus)
+
+    with scheduler, components.sink:
+        if lemmas:
+            # The corpus is the same for every lemma, so it is loaded once up front.
+            corpus = pipeline.run(StageContext(lemmas[0], config, components, n_jobs=scheduler.cores),
+                                  targets=['load'])
+            with ThreadPoolExecutor(max_workers=parallel_lemmas) as pool:
+                list(pool.map(run_lemma, lemmas, [corpus] * len(lemmas)))
+
+    output = config['output']
+    if output['text'] and output['format'] != 'legacy':
+        text_files = render_text_files(output['records_dir'], output['dir'], config['lemmas'])
+        print(f"Rendered {len(text_files)} TXT reports to {output['dir']}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Hebrew GDEX - Dictionary Example Generation")
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help="Path to YAML config")
+    parser.add_argument('--lemma', help="Run a single lemma instead of the configured list")
+    parser.add_argument('--fresh', action='store_true', help="Discard checkpoints before running")
+    parser.add_argument('--render', action='store_true',
+                        help="Render TXT reports from stored records instead of running the pipeline")
+    parser.add_argument('--export-store', action='store_true',
+                        help="Compile stored records into the read-only lookup store")
+    args = parser.parse_args()
+    if args.render:
+        render(args.config, lemma=args.lemma)
+    elif args.export_store:
+        export_store(args.config)
+    else:
+        main(args.config, lemma=args.lemma, fresh=args.fresh)
@@ -0,0 +1,56 @@
+from typing import Any, Dict, List
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+
+class CheckpointStore:
+    """On-disk cache of stage outputs, keyed by stage inputs and parameters."""
+
+    def __init__(self, directory: str = '.checkpoints', enabled: bool = True):
+        self.directory = directory
+        self.enabled = enabled
+
+    @staticmethod
+    def make_key(stage: str, params: Dict[str, Any], input_keys: List[str] = None) -> str:
+        payload = json.dumps(
+            {'stage': stage, 'params': params, 'inputs': list(input_keys or [])},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.directory, f"{stage}-{key[:16]}.pkl")
+
+    def has(self, stage: str, key: str) -> bool:
+        return self.enabled and os.path.exists(self._path(stage, key))
+
+    def load(self, stage: str, key: str) -> Any:
+        with open(self._path(stage, key), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, stage: str, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(stage, key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def clear(self) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+        return removed
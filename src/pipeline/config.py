@@ -0,0 +1,92 @@
+from typing import Dict
+import copy
+import os
+
+
+DEFAULT_CONFIG_PATH = os.path.join('config', 'default.yaml')
+
+DEFAULT_CONFIG = {
+    'lemmas': ['נקודה'],
+    'corpus': {
+        'path': os.path.join('data', 'heb_news_2020_1M', 'heb_news_2020_1M-sentences.txt'),
+        'max_lines': 50000,
+    },
+    'match': {
+        'use_lemmatizer': True,
+    },
+    'cluster': {
+        'n_clusters': None,
+        'max_examples_per_cluster': 5,
+    },
+    'collocate': {
+        'window': 4,
+        'cooccurrence_window': 5,
+        'top_cooccurrences': 10,
+    },
+    'score': {
+        'mode': 'full',
+        'num_examples': 20,
+        'diversity': True,
+        'weights': {
+            'length': 0.2,
+            'complexity': 0.15,
+            'completeness': 0.2,
+            'common_words': 0.2,
+            'informativeness': 0.25,
+        },
+        'streaming': {
+            'score_threshold': 0.8,
+            'time_budget': None,
+            'warmup': 200,
+        },
+    },
+    'output': {
+        'format': 'jsonl',
+        'dir': 'output',
+        'records_dir': os.path.join('output', 'records'),
+        'records_per_shard': 1000,
+        'text': False,
+    },
+    'store': {
+        'path': os.path.join('output', 'gdex_store.sqlite'),
+    },
+    'checkpoints': {
+        'dir': '.checkpoints',
+        'enabled': True,
+    },
+    'runtime': {
+        'cores': None,
+        'parallel_lemmas': None,
+    },
+}
+
+
+def _merge(base: Dict, overrides: Dict) -> Dict:
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def resolve_config(overrides: Dict = None) -> Dict:
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if overrides:
+        overrides = dict(overrides)
+        if 'lemma' in overrides:
+            overrides['lemmas'] = [overrides.pop('lemma')]
+        _merge(config, overrides)
+    return config
+
+
+def load_pipeline_config(path: str = DEFAULT_CONFIG_PATH, overrides: Dict = None) -> Dict:
+    """Resolve the YAML config at `path`. Only the default path may be missing."""
+    loaded = {}
+    if os.path.exists(path):
+        import yaml
+        with open(path, 'r', encoding='utf-8') as f:
+            loaded = yaml.safe_load(f) or {}
+    elif path != DEFAULT_CONFIG_PATH:
+        raise FileNotFoundError(f"Config file not found: {path}")
+    return resolve_config({**loaded, **(overrides or {})})
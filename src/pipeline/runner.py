@@ -0,0 +1,106 @@
+from typing import Any, Callable, Dict, List, Sequence
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from .checkpoints import CheckpointStore
+
+
+class Stage:
+    """A named pipeline step.
+
+    `func` is called as `func(context, *input_values)`. `params` maps the
+    context to the dict of settings that affect the stage output; together
+    with the keys of `inputs` it forms the checkpoint key.
+    """
+
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (),
+                 params: Callable[[Any], Dict] = None, cache: bool = True):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = params or (lambda context: {})
+        self.cache = cache
+
+
+class Pipeline:
+    """Runs stages in dependency order, restoring unchanged ones from checkpoints.
+
+    With `parallel=True`, stages whose inputs are ready run concurrently on
+    threads; CPU-heavy work inside them goes to the shared TaskScheduler.
+    """
+
+    def __init__(self, stages: List[Stage], store: CheckpointStore = None, verbose: bool = True,
+                 parallel: bool = False):
+        self.stages = {}
+        for stage in stages:
+            for name in stage.inputs:
+                if name not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{name}'")
+            self.stages[stage.name] = stage
+        self.store = store or CheckpointStore(enabled=False)
+        self.verbose = verbose
+        self.parallel = parallel
+        self.status = {}
+
+    def keys(self, context) -> Dict[str, str]:
+        keys = {}
+        for name, stage in self.stages.items():
+            keys[name] = self.store.make_key(
+                name, stage.params(context), [keys[i] for i in stage.inputs]
+            )
+        return keys
+
+    def run(self, context, targets: Sequence[str] = None,
+            preloaded: Dict[str, Any] = None) -> Dict[str, Any]:
+        """`preloaded` supplies results computed by an earlier run whose keys
+        do not depend on this context (e.g. the corpus shared by all lemmas).
+        Runs for different contexts may share one Pipeline concurrently."""
+        keys = self.keys(context)
+        results = dict(preloaded or {})
+        status = {name: 'preloaded' for name in results}
+
+        lock = threading.Lock()
+        futures = {}
+        pool = ThreadPoolExecutor(max_workers=len(self.stages)) if self.parallel else None
+
+        def schedule(names: Sequence[str]) -> List[Any]:
+            if pool is None:
+                return [resolve(name) for name in names]
+            with lock:
+                pending = []
+                for name in names:
+                    if name not in futures:
+                        futures[name] = pool.submit(resolve, name)
+                    pending.append(futures[name])
+            return [future.result() for future in pending]
+
+        def resolve(name: str) -> Any:
+            if name in results:
+                return results[name]
+            stage = self.stages[name]
+            key = keys[name]
+            if stage.cache and self.store.has(name, key):
+                if self.verbose:
+                    label = getattr(context, 'lemma', None)
+                    print(f"[{label}] [{name}] restored from checkpoint" if label else
+                          f"[{name}] restored from checkpoint")
+                value = self.store.load(name, key)
+                outcome = 'cached'
+            else:
+                value = stage.func(context, *schedule(stage.inputs))
+                outcome = 'ran'
+                if stage.cache:
+                    self.store.save(name, key, value)
+            with lock:
+                results[name] = value
+                status[name] = outcome
+            return value
+
+        if targets is None:
+            targets = [list(self.stages)[-1]]
+        try:
+            schedule(targets)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.status = status
+        return results
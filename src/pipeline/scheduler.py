@@ -0,0 +1,215 @@
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+import multiprocessing as mp
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+
+
+_shared_cache = {}
+
+
+class SharedData:
+    """Handle to a read-only value published once by the scheduler.
+
+    Only the file path is pickled into tasks; each worker process loads the
+    value on first use and keeps it for later tasks. `TaskScheduler.unshare`
+    deletes the file, and workers drop values whose file is gone the next
+    time they load a new one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def get(self) -> Any:
+        if self.path not in _shared_cache:
+            for stale in [path for path in _shared_cache if not os.path.exists(path)]:
+                del _shared_cache[stale]
+            with open(self.path, 'rb') as f:
+                _shared_cache[self.path] = pickle.load(f)
+        return _shared_cache[self.path]
+
+
+class Task:
+    """`func(*args, *dependency_results)`, run once all `deps` have finished."""
+
+    def __init__(self, func: Callable, args: Sequence = (), deps: Sequence[str] = (), cores: int = 1):
+        self.func = func
+        self.args = tuple(args)
+        self.deps = tuple(deps)
+        self.cores = cores
+
+
+def limit_threads(threads: int = 1) -> None:
+    """Cap this process's BLAS/OpenMP (and torch, if loaded) thread pools."""
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+
+
+def _init_worker():
+    # Each task owns the cores it reserved; keep its thread pools from oversubscribing them.
+    limit_threads(1)
+
+
+class TaskScheduler:
+    """Process pool shared by every stage of a run, bounded by a global core budget.
+
+    With a budget of one core, tasks run inline in the calling process.
+    """
+
+    def __init__(self, cores: int = None):
+        self.cores = max(1, cores or mp.cpu_count())
+        self._available = self.cores
+        self._condition = threading.Condition()
+        self._executor = None
+        self._tmpdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def parallel(self) -> bool:
+        return self.cores > 1
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Concurrent lemmas submit from several threads; create exactly one pool.
+        with self._condition:
+            if self._executor is None:
+                # Workers must not inherit the parent's torch/OpenMP thread state.
+                method = 'forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn'
+                context = mp.get_context(method)
+                self._executor = ProcessPoolExecutor(max_workers=self.cores, mp_context=context,
+                                                     initializer=_init_worker)
+            return self._executor
+
+    def _try_acquire(self, cores: int) -> bool:
+        with self._condition:
+            if self._available < cores:
+                return False
+            self._available -= cores
+            return True
+
+    def _acquire(self, cores: int) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: self._available >= cores)
+            self._available -= cores
+
+    def _release(self, cores: int) -> None:
+        with self._condition:
+            self._available += cores
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, cores: int = 1):
+        """Hold `cores` of the budget for work done in the calling process."""
+        if not self.parallel:
+            yield
+            return
+        cores = min(cores, self.cores)
+        self._acquire(cores)
+        try:
+            yield
+        finally:
+            self._release(cores)
+
+    def share(self, value: Any) -> SharedData:
+        with self._condition:
+            if self._tmpdir is None:
+                self._tmpdir = tempfile.mkdtemp(prefix='gdex-shared-')
+            tmpdir = self._tmpdir
+        fd, path = tempfile.mkstemp(dir=tmpdir, suffix='.pkl')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return SharedData(path)
+
+    def unshare(self, shared: SharedData) -> None:
+        """Release a shared value once no pending task needs it."""
+        _shared_cache.pop(shared.path, None)
+        if os.path.exists(shared.path):
+            os.remove(shared.path)
+
+    def submit(self, func: Callable, *args, cores: int = 1) -> Future:
+        cores = min(cores, self.cores)
+        if not self.parallel:
+            future = Future()
+            try:
+                future.set_result(func(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+            return future
+        self._acquire(cores)
+        future = self._pool().submit(func, *args)
+        future.add_done_callback(lambda f: self._release(cores))
+        return future
+
+    def map(self, func: Callable, args_list: Iterable[Sequence]) -> List[Any]:
+        tasks = {i: Task(func, args) for i, args in enumerate(args_list)}
+        results = self.run(tasks)
+        return [results[i] for i in range(len(tasks))]
+
+    def run(self, tasks: Dict[Any, Task]) -> Dict[Any, Any]:
+        for name, task in tasks.items():
+            for dep in task.deps:
+                if dep not in tasks:
+                    raise ValueError(f"Task '{name}' depends on unknown task '{dep}'")
+
+        results = {}
+        pending = dict(tasks)
+        running = {}
+
+        if not self.parallel:
+            while pending:
+                ready = [n for n, t in pending.items() if all(d in results for d in t.deps)]
+                if not ready:
+                    raise ValueError(f"Dependency cycle among tasks {list(pending)}")
+                for name in ready:
+                    task = pending.pop(name)
+                    results[name] = task.func(*task.args, *(results[d] for d in task.deps))
+            return results
+
+        try:
+            while pending or running:
+                ready = [n for n, t in pending.items() if all(d in results for d in t.deps)]
+                if not ready and not running:
+                    raise ValueError(f"Dependency cycle among tasks {list(pending)}")
+                for name in ready:
+                    task = pending[name]
+                    cores = min(task.cores, self.cores)
+                    if running and not self._try_acquire(cores):
+                        break
+                    if not running:
+                        self._acquire(cores)
+                    del pending[name]
+                    future = self._pool().submit(task.func, *task.args, *(results[d] for d in task.deps))
+                    future.add_done_callback(lambda f, cores=cores: self._release(cores))
+                    running[future] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+        return results
+
+    def close(self) -> None:
+        with self._condition:
+            executor, self._executor = self._executor, None
+            tmpdir, self._tmpdir = self._tmpdir, None
+        if executor is not None:
+            executor.shutdown()
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
@@ -0,0 +1,340 @@
+from typing import Callable, Dict, List
+from collections import Counter
+from datetime import datetime
+import os
+import threading
+from .checkpoints import CheckpointStore
+from .runner import Pipeline, Stage
+
+
+SAMPLE_SENTENCES = [
+    "העלה נקודה מאוד מעניינת בוויכוח הזה על העתיד של החינוך.",
+    "הם שברו שיוויון בדקה התשעים שהבקיעו עוד גול וזכו בנקודה נוספת.",
+    "נקודה חשובה שצריך לזכור היא שהחינוך משתנה עם הזמן.",
+    "הקבוצה צברה נקודה בלבד במשחק האחרון נגד היריבה.",
+    "זו נקודה מעניינת שראוי להעלות בדיון הבא.",
+    "הם הפסידו נקודה חשובה במאבק על המקום הראשון.",
+    "נקודה נוספת לדיון היא השפעת הטכנולוגיה על החברה.",
+    "הבקיעו גול וקיבלו נקודה אחת בטבלה.",
+]
+
+
+class Components:
+    """Shared pipeline components. The lemmatizer is only built when a stage needs it."""
+
+    def __init__(self, cooccurrence_extractor, wsd_handler, gdex_scorer,
+                 sink=None, lemmatizer_factory: Callable = None, scheduler=None):
+        self.cooccurrence_extractor = cooccurrence_extractor
+        self.wsd_handler = wsd_handler
+        self.gdex_scorer = gdex_scorer
+        self.sink = sink
+        self.scheduler = scheduler
+        self.lemmatizer_factory = lemmatizer_factory
+        self._lemmatizer = None
+        self._lock = threading.Lock()
+
+    @property
+    def lemmatizer(self):
+        with self._lock:
+            if self._lemmatizer is None and self.lemmatizer_factory is not None:
+                self._lemmatizer = self.lemmatizer_factory()
+        return self._lemmatizer
+
+
+class StageContext:
+    """Per-lemma run state. With `progress=False` (several lemmas at once)
+    progress bars are turned off; stage output is always tagged with the lemma."""
+
+    def __init__(self, lemma: str, config: Dict, components: Components, n_jobs: int = 1,
+                 progress: bool = True):
+        self.lemma = lemma
+        self.config = config
+        self.components = components
+        self.n_jobs = n_jobs
+        self.progress = progress
+
+    def log(self, message: str = '') -> None:
+        print("\n".join(f"[{self.lemma}] {line}" if line else "" for line in message.split("\n")))
+
+
+def _file_fingerprint(path: str):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _format_examples(examples: List[Dict]) -> str:
+    lines = [f"\nTop {len(examples)} examples:\n"]
+    for i, example in enumerate(examples, 1):
+        lines.append(f"{i}. [score: {example['score']:.2f}, cluster: {example['sense_cluster']}]")
+        lines.append(f"   {example['sentence']}\n")
+    return "\n".join(lines)
+
+
+def load_stage(context: StageContext) -> List[str]:
+    corpus = context.config['corpus']
+    print(f"Loading corpus (using {context.n_jobs} cores)...")
+    if os.path.exists(corpus['path']):
+        sentences = context.components.cooccurrence_extractor.load_corpus(
+            corpus['path'], max_lines=corpus['max_lines']
+        )
+    else:
+        print("No corpus found - using sample sentences")
+        sentences = list(SAMPLE_SENTENCES)
+    print(f"Loaded {len(sentences):,} sentences\n")
+    return sentences
+
+
+def match_stage(context: StageContext, sentences: List[str]) -> Dict:
+    lemmatizer = None
+    if context.config['match']['use_lemmatizer']:
+        lemmatizer = context.components.lemmatizer
+
+    context.log(f"Finding sentences with '{context.lemma}'...")
+    matching_sentences = context.components.cooccurrence_extractor.extract_sentences_with_lemma(
+        context.lemma, sentences, lemmatizer, n_jobs=context.n_jobs, progress=context.progress
+    )
+    context.log(f"Found {len(matching_sentences)} matches\n")
+    return {'corpus_size': len(sentences), 'matches': matching_sentences}
+
+
+def dedupe_stage(context: StageContext, matched: Dict) -> Dict:
+    seen = set()
+    unique = []
+    for sentence in matched['matches']:
+        normalized = ' '.join(sentence.split())
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        unique.append(sentence)
+
+    removed = len(matched['matches']) - len(unique)
+    if removed:
+        context.log(f"Removed {removed} duplicate sentences\n")
+    return {'corpus_size': matched['corpus_size'], 'matches': unique}
+
+
+def cluster_stage(context: StageContext, deduped: Dict) -> Dict[int, List[str]]:
+    if not deduped['matches']:
+        return {}
+    params = context.config['cluster']
+    context.log("Clustering by sense...")
+    sense_clusters = context.components.wsd_handler.disambiguate(
+        context.lemma, deduped['matches'],
+        n_clusters=params['n_clusters'],
+        max_examples_per_cluster=params['max_examples_per_cluster']
+    )
+    context.log(f"Identified {len(sense_clusters)} clusters")
+    return sense_clusters
+
+
+def collocate_stage(context: StageContext, deduped: Dict,
+                    sense_clusters: Dict[int, List[str]], cooccurrences: Counter = None) -> Dict:
+    """Cluster collocations come from the clustered sentences; co-occurrences
+    from every match, or from `cooccurrences` when they were counted upstream."""
+    if not deduped['matches']:
+        return {'cluster_collocations': {}, 'top_cooccurrences': []}
+    params = context.config['collocate']
+    extractor = context.components.cooccurrence_extractor
+    scheduler = context.components.scheduler
+
+    # Co-occurrence counting does not depend on the clusters, so it runs alongside them.
+    counting = None
+    if cooccurrences is not None:
+        extractor.cooccurrences[context.lemma] = cooccurrences
+    elif scheduler is not None and scheduler.parallel:
+        counting = scheduler.submit(type(extractor).count_cooccurrences, context.lemma,
+                                    deduped['matches'], params['cooccurrence_window'])
+
+    cluster_collocations = context.components.wsd_handler.extract_cluster_specific_collocations(
+        context.lemma, sense_clusters, window=params['window']
+    )
+    for cluster_id, cluster_sents in sense_clusters.items():
+        top_patterns = list(cluster_collocations[cluster_id].items())[:5]
+        context.log(f"  Cluster {cluster_id}: {len(cluster_sents)} sentences - {top_patterns}")
+
+    context.log("\nExtracting co-occurrences...")
+    if counting is not None:
+        extractor.cooccurrences[context.lemma] = counting.result()
+    elif cooccurrences is None:
+        extractor.extract_cooccurrences(
+            context.lemma, deduped['matches'], window_size=params['cooccurrence_window']
+        )
+    top_cooccurrences = extractor.get_top_cooccurrences(context.lemma, n=params['top_cooccurrences'])
+    context.log("\n".join(["Top co-occurring words:"] + [f"  {word}: {count}" for word, count in top_cooccurrences]))
+
+    return {'cluster_collocations': cluster_collocations, 'top_cooccurrences': top_cooccurrences}
+
+
+def score_stage(context: StageContext, deduped: Dict,
+                sense_clusters: Dict[int, List[str]]) -> List[Dict]:
+    if not deduped['matches']:
+        return []
+    params = context.config['score']
+    scorer = context.components.gdex_scorer
+    scorer.weights.update(params['weights'])
+
+    context.log("\nGenerating examples...")
+    examples = scorer.generate_examples(
+        context.lemma,
+        deduped['matches'],
+        top_n=params['num_examples'],
+        diversity=params['diversity'],
+        sense_clusters=sense_clusters
+    )
+
+    context.log(_format_examples(examples))
+    return examples
+
+
+def select_stage(context: StageContext, sentences: List[str]) -> Dict:
+    params = context.config['score']
+    streaming = params['streaming']
+    lemmatizer = None
+    if context.config['match']['use_lemmatizer']:
+        lemmatizer = context.components.lemmatizer
+    scorer = context.components.gdex_scorer
+    scorer.weights.update(params['weights'])
+    extractor = context.components.cooccurrence_extractor
+    window = context.config['collocate']['cooccurrence_window']
+
+    # The heaps only keep the selected examples, so corpus statistics are
+    # counted over every scanned candidate as it goes by.
+    cooccurrences = Counter()
+
+    def count(sentence):
+        cooccurrences.update(extractor.count_cooccurrences(context.lemma, [sentence], window))
+
+    context.log(f"Streaming candidates with '{context.lemma}'...")
+    candidates = extractor.iter_sentences_with_lemma(
+        context.lemma, sentences, lemmatizer, yield_misses=True
+    )
+    selection = scorer.generate_examples_streaming(
+        context.lemma,
+        candidates,
+        top_n=params['num_examples'],
+        diversity=params['diversity'],
+        score_threshold=streaming['score_threshold'],
+        time_budget=streaming['time_budget'],
+        warmup=streaming['warmup'],
+        on_candidate=count,
+        n_clusters=context.config['cluster']['n_clusters']
+    )
+    status = "final" if selection['final'] else f"partial, stopped on {selection['stop_reason']}"
+    context.log(f"Scanned {selection['candidates_seen']} matches ({status})")
+    context.log(f"Identified {len(selection['sense_clusters'])} clusters")
+
+    examples = selection['examples']
+    context.log(_format_examples(examples))
+
+    kept = [s for cluster_sents in selection['sense_clusters'].values() for s in cluster_sents]
+    return {
+        'corpus_size': len(sentences),
+        'matches': kept,
+        'candidates_seen': selection['candidates_seen'],
+        'cooccurrences': cooccurrences,
+        'sense_clusters': selection['sense_clusters'],
+        'examples': examples,
+        'final': selection['final'],
+    }
+
+
+def build_record(lemma: str, timestamp: str, deduped: Dict, sense_clusters: Dict[int, List[str]],
+                 collocated: Dict, examples: List[Dict], final: bool = True) -> Dict:
+    record = {
+        "lemma": lemma,
+        "timestamp": timestamp,
+        "final": bool(final),
+        "corpus_size": int(deduped['corpus_size']),
+        "matching_sentences_count": int(deduped.get('candidates_seen', len(deduped['matches']))),
+        "n_clusters": int(len(sense_clusters)),
+        "clusters": {},
+        "top_cooccurrences": {k: int(v) for k, v in collocated['top_cooccurrences']},
+        "examples": [
+            {
+                "sentence": ex["sentence"],
+                "score": float(ex["score"]),
+                "sense_cluster": int(ex["sense_cluster"]),
+                "lemma": ex["lemma"]
+            }
+            for ex in examples
+        ]
+    }
+
+    for cluster_id, cluster_sents in sense_clusters.items():
+        patterns = collocated['cluster_collocations'][cluster_id]
+        record["clusters"][str(cluster_id)] = {
+            "size": int(len(cluster_sents)),
+            "top_collocations": {k: int(v) for k, v in list(patterns.items())[:10]},
+            "sentences": list(cluster_sents)
+        }
+    return record
+
+
+def write_stage(context: StageContext, deduped: Dict, sense_clusters: Dict[int, List[str]],
+                collocated: Dict, examples: List[Dict], final: bool = True) -> str:
+    lemma = context.lemma
+    if not deduped['matches']:
+        context.log(f"No examples found for '{lemma}'")
+        return None
+
+    context.log("Saving results...")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    record = build_record(lemma, timestamp, deduped, sense_clusters, collocated, examples, final=final)
+    output_file = context.components.sink.write(record)
+    if output_file.endswith('.part'):
+        context.log(f"Queued in {output_file} (committed when the shard rotates or the run ends)\n")
+    else:
+        context.log(f"Saved to {output_file}\n")
+    return output_file
+
+
+def _score_params(ctx: StageContext) -> Dict:
+    return {k: v for k, v in ctx.config['score'].items() if k not in ('mode', 'streaming')}
+
+
+def build_pipeline(store: CheckpointStore = None, config: Dict = None, parallel: bool = False) -> Pipeline:
+    """Full mode matches and clusters every candidate before scoring; streaming
+    mode scores candidates as the search yields them (see `select_stage`)."""
+    load = Stage('load', load_stage,
+                 params=lambda ctx: {
+                     'path': ctx.config['corpus']['path'],
+                     'max_lines': ctx.config['corpus']['max_lines'],
+                     'fingerprint': _file_fingerprint(ctx.config['corpus']['path']),
+                 })
+
+    score_config = (config or {}).get('score', {})
+    if score_config.get('mode') == 'streaming':
+        # Time-budgeted selections are not reproducible, so only cache unbounded ones.
+        return Pipeline([
+            load,
+            Stage('select', select_stage, inputs=['load'],
+                  params=lambda ctx: {'lemma': ctx.lemma, 'match': ctx.config['match'],
+                                      'streaming': ctx.config['score']['streaming'],
+                                      'cooccurrence_window': ctx.config['collocate']['cooccurrence_window'],
+                                      'cluster': ctx.config['cluster'],
+                                      **_score_params(ctx)},
+                  cache=score_config['streaming'].get('time_budget') is None),
+            Stage('collocate', lambda ctx, sel: collocate_stage(ctx, sel, sel['sense_clusters'],
+                                                                sel['cooccurrences']),
+                  inputs=['select'], params=lambda ctx: dict(ctx.config['collocate'])),
+            Stage('write', lambda ctx, sel, col: write_stage(ctx, sel, sel['sense_clusters'], col,
+                                                             sel['examples'], final=sel['final']),
+                  inputs=['select', 'collocate'], params=lambda ctx: dict(ctx.config['output']),
+                  cache=False),
+        ], store=store, parallel=parallel)
+
+    return Pipeline([
+        load,
+        Stage('match', match_stage, inputs=['load'],
+              params=lambda ctx: {'lemma': ctx.lemma, **ctx.config['match']}),
+        Stage('dedupe', dedupe_stage, inputs=['match']),
+        Stage('cluster', cluster_stage, inputs=['dedupe'],
+              params=lambda ctx: dict(ctx.config['cluster'])),
+        Stage('collocate', collocate_stage, inputs=['dedupe', 'cluster'],
+              params=lambda ctx: dict(ctx.config['collocate'])),
+        Stage('score', score_stage, inputs=['dedupe', 'cluster'], params=_score_params),
+        Stage('write', write_stage, inputs=['dedupe', 'cluster', 'collocate', 'score'],
+              params=lambda ctx: dict(ctx.config['output']), cache=False),
+    ], store=store, parallel=parallel)
@@ -5,17 +5,45 @@ from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
 import numpy as np
 import stanza
+import threading
 
 
 ALLOWED_POS = {'NOUN', 'PROPN', 'VERB', 'ADJ', 'ADV'}
 
 
+class SenseAssigner:
+    """Assigns new sentences to clusters fitted on a sample of matches."""
+
+    def __init__(self, vectorizer=None, kmeans=None):
+        self.vectorizer = vectorizer
+        self.kmeans = kmeans
+        self.n_clusters = kmeans.n_clusters if kmeans is not None else 1
+
+    def assign(self, sentences: List[str]) -> List[int]:
+        if self.kmeans is None or not sentences:
+            return [0] * len(sentences)
+        return [int(label) for label in self.kmeans.predict(self.vectorizer.transform(sentences))]
+
+
+def _silhouette(X, k: int) -> float:
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+    labels = kmeans.fit_predict(X)
+    return silhouette_score(X, labels)
+
+
+def _shared_silhouette(shared_X, k: int) -> float:
+    return _silhouette(shared_X.get(), k)
+
+
 class WsdHandler:
-    def __init__(self, corpus_path: str = None):
+    def __init__(self, corpus_path: str = None, scheduler=None):
         self.corpus_path = corpus_path
         self.sense_dict = {}
         self.context_patterns = defaultdict(list)
         self.nlp = None
+        self.scheduler = scheduler
+        # Stanza is loaded once, in this process; concurrent lemmas take turns.
+        self._nlp_lock = threading.Lock()
         
     def disambiguate(self, lemma: str, sentences: List[str], 
                      n_clusters: int = None, max_examples_per_cluster: int = 5) -> Dict[int, List[str]]:
@@ -46,6 +74,26 @@ class WsdHandler:
         
         return result
     
+    def build_sense_assigner(self, lemma: str, sentences: List[str],
+                             n_clusters: int = None) -> SenseAssigner:
+        if len(sentences) < 3:
+            return SenseAssigner()
+        
+        vectorizer = TfidfVectorizer(max_features=100, ngram_range=(1, 2))
+        try:
+            X = vectorizer.fit_transform(sentences)
+        except ValueError:
+            return SenseAssigner()
+        
+        if n_clusters is None:
+            n_clusters = self._find_optimal_clusters(X, sentences)
+        else:
+            n_clusters = min(n_clusters, len(sentences))
+        
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        kmeans.fit(X)
+        return SenseAssigner(vectorizer, kmeans)
+    
     def _find_optimal_clusters(self, X, sentences: List[str]) -> int:
         n = len(sentences)
         max_k = min(8, n // 3)
@@ -56,43 +104,60 @@ class WsdHandler:
         best_k = 2
         best_score = -1
         
-        for k in range(2, max_k + 1):
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            labels = kmeans.fit_predict(X)
-            score = silhouette_score(X, labels)
-            
+        candidates = range(2, max_k + 1)
+        if self.scheduler is not None and self.scheduler.parallel:
+            shared_X = self.scheduler.share(X)
+            try:
+                scores = self.scheduler.map(_shared_silhouette, [(shared_X, k) for k in candidates])
+            finally:
+                self.scheduler.unshare(shared_X)
+        else:
+            scores = [_silhouette(X, k) for k in candidates]
+        
+        for k, score in zip(candidates, scores):
             if score > best_score:
                 best_score = score
                 best_k = k
         
         return best_k
 
+    def annotate(self, sentence: str) -> List[List[Tuple[str, str, str]]]:
+        """(text, lemma, upos) for every word, grouped by Stanza sentence."""
+        with self._nlp_lock:
+            if self.nlp is None:
+                import torch
+                torch.serialization.add_safe_globals([type(lambda: None)])
+                self.nlp = stanza.Pipeline('he', processors='tokenize,pos,lemma', 
+                                          use_gpu=False, verbose=False)
+            doc = self.nlp(sentence)
+        return [[(word.text, word.lemma, word.upos) for word in sent.words] for sent in doc.sentences]
+
     def extract_collocational_patterns(self, lemma: str, sentences: List[str], 
-                                       window: int = 4) -> Dict[str, int]:
-        if self.nlp is None:
-            import torch
-            torch.serialization.add_safe_globals([type(lambda: None)])
-            self.nlp = stanza.Pipeline('he', processors='tokenize,pos,lemma', 
-                                      use_gpu=False, verbose=False)
-        
+                                       window: int = 4,
+                                       annotations: Dict[str, list] = None) -> Dict[str, int]:
+        """`annotations` maps sentences to stored `annotate` output, so already
+        tagged sentences (e.g. from partial results) are not tagged again."""
+        annotations = annotations or {}
         collocations = Counter()
         
         for sentence in sentences:
-            doc = self.nlp(sentence)
-            for sent in doc.sentences:
+            annotated = annotations.get(sentence)
+            if annotated is None:
+                annotated = self.annotate(sentence)
+            for words in annotated:
                 target_indices = []
-                for i, word in enumerate(sent.words):
-                    if word.lemma == lemma or word.text == lemma:
+                for i, (text, word_lemma, _) in enumerate(words):
+                    if word_lemma == lemma or text == lemma:
                         target_indices.append(i)
                 
                 for target_idx in target_indices:
-                    for i, word in enumerate(sent.words):
+                    for i, (_, word_lemma, upos) in enumerate(words):
                         if i == target_idx:
                             continue
                         
                         if abs(i - target_idx) <= window:
-                            if word.upos in ALLOWED_POS:
-                                collocations[word.lemma] += 1
+                            if upos in ALLOWED_POS:
+                                collocations[word_lemma] += 1
         
         return dict(collocations.most_common(20))
 
@@ -124,12 +189,14 @@ class WsdHandler:
         
         return filtered_results
 
-    def generate_senses(self, lemma: str, sentences: List[str]) -> List[Dict]:
+    def generate_senses(self, lemma: str, sentences: List[str],
+                        annotations: Dict[str, list] = None) -> List[Dict]:
         clusters = self.disambiguate(lemma, sentences)
         
         senses = []
         for cluster_id, examples in clusters.items():
-            patterns = self.extract_collocational_patterns(lemma, examples, window=4)
+            patterns = self.extract_collocational_patterns(lemma, examples, window=4,
+                                                           annotations=annotations)
             
             sense = {
                 'sense_id': cluster_id,
@@ -0,0 +1,115 @@
+from typing import Dict, Iterator, List
+from datetime import datetime
+import glob
+import json
+import os
+from .sharded import load_records
+
+
+def to_legacy_json(record: Dict) -> Dict:
+    """The per-lemma JSON layout written before sharded output existed."""
+    results = dict(record)
+    results['clusters'] = {
+        cluster_id: {k: v for k, v in cluster.items() if k != 'sentences'}
+        for cluster_id, cluster in record['clusters'].items()
+    }
+    return results
+
+
+def render_text(record: Dict) -> str:
+    lemma = record['lemma']
+    created = datetime.strptime(record['timestamp'], "%Y%m%d_%H%M%S")
+    lines = []
+
+    lines.append(f"תוצאות GDEX עבור: {lemma}\n")
+    lines.append(f"נוצר ב: {created.strftime('%d/%m/%Y %H:%M')}\n")
+    if not record.get('final', True):
+        lines.append("תוצאות חלקיות (החיפוש נעצר מוקדם)\n")
+    lines.append("=" * 80 + "\n\n")
+
+    lines.append(f"גודל קורפוס: {record['corpus_size']:,} משפטים\n")
+    lines.append(f"משפטים עם '{lemma}': {record['matching_sentences_count']}\n")
+    lines.append(f"מספר אשכולות משמעות: {record['n_clusters']}\n\n")
+    lines.append("=" * 80 + "\n\n")
+
+    for cluster_id, cluster in sorted(record['clusters'].items(), key=lambda x: int(x[0])):
+        cluster_sents = cluster.get('sentences', [])
+        top_collocations = ", ".join([f"{word} ({count})" for word, count in
+                                      list(cluster['top_collocations'].items())[:8]])
+
+        lines.append(f"אשכול {cluster_id}\n")
+        lines.append(f"גודל: {cluster['size']} משפטים\n")
+        lines.append(f"קולוקציות: {top_collocations}\n")
+        lines.append("\nדוגמאות:\n\n")
+
+        for i, sent in enumerate(cluster_sents[:5], 1):
+            lines.append(f"{i}. {sent}\n\n")
+
+        if cluster['size'] > 5:
+            lines.append(f"(ועוד {cluster['size'] - 5} משפטים נוספים)\n")
+
+        lines.append("\n" + "-" * 80 + "\n\n")
+
+    lines.append("=" * 80 + "\n")
+    lines.append("מילים נפוצות לצד הלמה\n")
+    lines.append("=" * 80 + "\n\n")
+    for word, count in record['top_cooccurrences'].items():
+        lines.append(f"{word:20} {count}\n")
+
+    lines.append("\n" + "=" * 80 + "\n")
+    lines.append("דוגמאות מובילות (לפי ציון GDEX)\n")
+    lines.append("=" * 80 + "\n\n")
+
+    for i, example in enumerate(record['examples'], 1):
+        lines.append(f"[{i}] ציון: {example['score']:.2f} | אשכול: {example['sense_cluster']}\n")
+        lines.append(f"{example['sentence']}\n\n")
+
+    return "".join(lines)
+
+
+def write_text_file(record: Dict, output_dir: str) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    text_file = os.path.join(output_dir, f"gdex_results_{record['lemma']}_{record['timestamp']}.txt")
+    with open(text_file, 'w', encoding='utf-8') as f:
+        f.write(render_text(record))
+    return text_file
+
+
+class LegacyWriter:
+    """Writes each record as `gdex_results_<lemma>_<ts>.json` plus a TXT report."""
+
+    def __init__(self, output_dir: str = 'output'):
+        self.output_dir = output_dir
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record: Dict) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_file = os.path.join(self.output_dir,
+                                   f"gdex_results_{record['lemma']}_{record['timestamp']}.json")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(to_legacy_json(record), f, ensure_ascii=False, indent=2)
+        write_text_file(record, self.output_dir)
+        return output_file
+
+    def close(self) -> None:
+        pass
+
+
+def render_text_files(records_dir: str, output_dir: str, lemmas: List[str] = None) -> List[str]:
+    records = load_records(records_dir, lemmas)
+    return [write_text_file(record, output_dir) for record in records.values()]
+
+
+def iter_legacy_records(output_dir: str) -> Iterator[Dict]:
+    """Records read back from per-lemma JSON files, oldest first."""
+    results = []
+    for path in glob.glob(os.path.join(output_dir, "gdex_results_*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            results.append(json.load(f))
+    results.sort(key=lambda r: r['timestamp'])
+    return iter(results)
@@ -0,0 +1,249 @@
+from typing import Dict, Iterator, List
+import fcntl
+import json
+import os
+import tempfile
+import threading
+
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.lock'
+MANIFEST_VERSION = 1
+FORMATS = ('jsonl', 'parquet')
+
+# Nested fields are stored as JSON strings in columnar shards.
+_PARQUET_SCALARS = ('lemma', 'timestamp', 'final', 'corpus_size', 'matching_sentences_count', 'n_clusters')
+_PARQUET_NESTED = ('clusters', 'top_cooccurrences', 'examples')
+
+
+def _atomic_write_text(path: str, text: str) -> None:
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_manifest(directory: str) -> Dict:
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'version': MANIFEST_VERSION, 'format': None, 'shards': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version: {manifest.get('version')}")
+    return manifest
+
+
+class ShardedRecordSink:
+    """Appends one compact record per lemma to rotating shard files.
+
+    Records go to a `.part` file; when a shard is full (or the sink is
+    closed) it is renamed into place and added to `manifest.json`. Readers
+    only ever see shards listed in the manifest. Reopening a directory
+    commits whatever complete records an interrupted run left behind.
+    A sink holds a lock on its directory, so there is one writer at a time.
+    """
+
+    def __init__(self, directory: str, fmt: str = 'jsonl', records_per_shard: int = 1000):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}', expected one of {FORMATS}")
+        self.directory = directory
+        self.fmt = fmt
+        self.records_per_shard = max(1, records_per_shard)
+
+        os.makedirs(directory, exist_ok=True)
+        # flock is released by the OS if the process dies, so a crash never
+        # leaves the directory locked; `.part` files are only recovered under it.
+        self._dir_lock = open(os.path.join(directory, LOCK_NAME), 'a')
+        try:
+            fcntl.flock(self._dir_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._dir_lock.close()
+            raise RuntimeError(f"'{directory}' is already open for writing by another sink")
+
+        try:
+            self.manifest = read_manifest(directory)
+            if self.manifest['format'] not in (None, fmt):
+                raise ValueError(f"'{directory}' already holds {self.manifest['format']} shards")
+            self.manifest['format'] = fmt
+
+            self._next_index = len(self.manifest['shards'])
+            self._file = None
+            self._buffer = []
+            self._lemmas = []
+            self._lock = threading.Lock()
+            self._recover()
+        except BaseException:
+            self._dir_lock.close()
+            raise
+
+    def _recover(self) -> None:
+        """Commit shards left behind by a run that died before closing the sink.
+
+        A renamed shard missing from the manifest is listed as is. A jsonl
+        `.part` file keeps every complete line and is committed as a shard;
+        parquet `.part` files are only written during rotation and are dropped.
+        """
+        listed = {shard['file'] for shard in self.manifest['shards']}
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.part'):
+                if self.fmt != 'jsonl' or not name.endswith('.jsonl.part'):
+                    os.remove(path)
+                    continue
+                lines = self._complete_lines(path)
+                if not lines:
+                    os.remove(path)
+                    continue
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.writelines(lines)
+                self._lemmas = [json.loads(line)['lemma'] for line in lines]
+                self._commit(path)
+            elif name.startswith('part-') and name.endswith('.' + self.fmt) and name not in listed:
+                self._lemmas = [r['lemma'] for r in (_read_jsonl(path) if self.fmt == 'jsonl'
+                                                     else _read_parquet(path))]
+                self._commit(path)
+
+    @staticmethod
+    def _complete_lines(path: str) -> List[str]:
+        lines = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                lines.append(line)
+        return lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _shard_name(self) -> str:
+        return f"part-{self._next_index:05d}.{self.fmt}"
+
+    def _part_path(self) -> str:
+        return os.path.join(self.directory, self._shard_name() + '.part')
+
+    def write(self, record: Dict) -> str:
+        """Append a record; returns the shard it was committed to, or the
+        `.part` file it is pending in until the next rotation."""
+        with self._lock:
+            part_path = self._part_path()
+            if self.fmt == 'jsonl':
+                if self._file is None:
+                    self._file = open(part_path, 'w', encoding='utf-8')
+                self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                self._file.write('\n')
+                self._file.flush()
+            else:
+                self._buffer.append(record)
+            self._lemmas.append(record['lemma'])
+
+            if len(self._lemmas) >= self.records_per_shard:
+                shard_path = os.path.join(self.directory, self._shard_name())
+                self._rotate()
+                return shard_path
+            return part_path
+
+    def _write_parquet(self, path: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {name: [r.get(name) for r in self._buffer] for name in _PARQUET_SCALARS}
+        for name in _PARQUET_NESTED:
+            columns[name] = [json.dumps(r[name], ensure_ascii=False, separators=(',', ':'))
+                             for r in self._buffer]
+        pq.write_table(pa.table(columns), path)
+
+    def rotate(self) -> None:
+        with self._lock:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        if not self._lemmas:
+            return
+        part_path = self._part_path()
+        if self.fmt == 'jsonl':
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        else:
+            self._write_parquet(part_path)
+            self._buffer = []
+        self._commit(part_path)
+
+    def _commit(self, path: str) -> None:
+        shard_name = self._shard_name()
+        if path != os.path.join(self.directory, shard_name):
+            os.replace(path, os.path.join(self.directory, shard_name))
+        self.manifest['shards'].append({
+            'file': shard_name,
+            'records': len(self._lemmas),
+            'lemmas': self._lemmas,
+        })
+        _atomic_write_text(os.path.join(self.directory, MANIFEST_NAME),
+                           json.dumps(self.manifest, ensure_ascii=False, indent=2))
+        self._next_index += 1
+        self._lemmas = []
+
+    def close(self) -> None:
+        if self._dir_lock is None:
+            return
+        try:
+            self.rotate()
+        finally:
+            fcntl.flock(self._dir_lock, fcntl.LOCK_UN)
+            self._dir_lock.close()
+            self._dir_lock = None
+
+
+def _read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_parquet(path: str) -> Iterator[Dict]:
+    import pyarrow.parquet as pq
+
+    for row in pq.read_table(path).to_pylist():
+        for name in _PARQUET_NESTED:
+            row[name] = json.loads(row[name])
+        yield row
+
+
+def iter_records(directory: str, lemmas: List[str] = None) -> Iterator[Dict]:
+    manifest = read_manifest(directory)
+    wanted = set(lemmas) if lemmas else None
+    for shard in manifest['shards']:
+        if wanted is not None and wanted.isdisjoint(shard['lemmas']):
+            continue
+        path = os.path.join(directory, shard['file'])
+        if manifest['format'] == 'parquet':
+            records = _read_parquet(path)
+        else:
+            records = _read_jsonl(path)
+        for record in records:
+            if wanted is None or record['lemma'] in wanted:
+                yield record
+
+
+def load_records(directory: str, lemmas: List[str] = None) -> Dict[str, Dict]:
+    """Latest record per lemma; later shards win over earlier ones."""
+    return {record['lemma']: record for record in iter_records(directory, lemmas)}
@@ -0,0 +1,27 @@
+def make_record(lemma, timestamp="20250101_120000"):
+    """A small pipeline record shared by the writer and store tests."""
+    return {
+        "lemma": lemma,
+        "timestamp": timestamp,
+        "final": True,
+        "corpus_size": 100,
+        "matching_sentences_count": 3,
+        "n_clusters": 2,
+        "clusters": {
+            "0": {
+                "size": 2,
+                "top_collocations": {"משחק": 2},
+                "sentences": ["הקבוצה צברה נקודה במשחק.", "הם זכו בנקודה במשחק."]
+            },
+            "1": {
+                "size": 1,
+                "top_collocations": {"דיון": 1},
+                "sentences": ["זו נקודה חשובה בדיון."]
+            }
+        },
+        "top_cooccurrences": {"חשובה": 2},
+        "examples": [
+            {"sentence": "הקבוצה צברה נקודה במשחק.", "score": 0.9, "sense_cluster": 0, "lemma": lemma},
+            {"sentence": "זו נקודה חשובה בדיון.", "score": 0.8, "sense_cluster": 1, "lemma": lemma}
+        ]
+    }
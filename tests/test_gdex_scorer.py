@@ -0,0 +1,116 @@
+import unittest
+from src.example_generator.gdex_scorer import GdexScorer
+
+
+GOOD = "זו נקודה חשובה מאוד שכדאי לזכור היטב בכל דיון ציבורי על עתיד החינוך בישראל."
+SHORT = "נקודה"
+
+
+class FakeAssigner:
+
+    n_clusters = 2
+
+    def assign(self, sentences):
+        return [0 if "משחק" in s else 1 for s in sentences]
+
+
+class FakeWsdHandler:
+
+    def __init__(self):
+        self.n_clusters = None
+
+    def build_sense_assigner(self, lemma, sentences, n_clusters=None):
+        self.n_clusters = n_clusters
+        return FakeAssigner()
+
+
+class TestStreamingSelection(unittest.TestCase):
+
+    def test_exhausted_stream_is_final(self):
+        scorer = GdexScorer()
+        result = scorer.generate_examples_streaming("נקודה", [SHORT, GOOD, SHORT], top_n=2,
+                                                    diversity=False, warmup=1, batch_size=1)
+
+        self.assertTrue(result['final'])
+        self.assertEqual(result['stop_reason'], 'exhausted')
+        self.assertEqual(result['candidates_seen'], 2)
+        self.assertEqual(result['examples'][0]['sentence'], GOOD)
+
+    def test_threshold_stops_early(self):
+        consumed = []
+
+        def candidates():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"{GOOD} {i}"
+
+        scorer = GdexScorer()
+        result = scorer.generate_examples_streaming("נקודה", candidates(), top_n=3, diversity=False,
+                                                    score_threshold=0.5, warmup=5, batch_size=5)
+
+        self.assertFalse(result['final'])
+        self.assertEqual(result['stop_reason'], 'threshold')
+        self.assertLess(len(consumed), 20)
+        self.assertEqual(len(result['examples']), 3)
+
+    def test_time_budget_stops_early(self):
+        def candidates():
+            i = 0
+            while True:
+                i += 1
+                yield f"{SHORT} {i}"
+
+        scorer = GdexScorer()
+        result = scorer.generate_examples_streaming("נקודה", candidates(), top_n=3, diversity=False,
+                                                    score_threshold=0.99, time_budget=0.05)
+
+        self.assertFalse(result['final'])
+        self.assertEqual(result['stop_reason'], 'time_budget')
+
+    def test_time_budget_checked_between_matches(self):
+        def candidates():
+            yield GOOD
+            while True:
+                yield None
+
+        scorer = GdexScorer()
+        result = scorer.generate_examples_streaming("נקודה", candidates(), top_n=3, diversity=False,
+                                                    time_budget=0.05, warmup=1)
+
+        self.assertFalse(result['final'])
+        self.assertEqual(result['stop_reason'], 'time_budget')
+        self.assertEqual(result['candidates_seen'], 1)
+
+    def test_on_candidate_sees_every_unique_candidate(self):
+        scanned = []
+        scorer = GdexScorer()
+        scorer.generate_examples_streaming("נקודה", [SHORT, None, GOOD, SHORT], top_n=1, diversity=False,
+                                           warmup=1, batch_size=1, on_candidate=scanned.append)
+
+        self.assertEqual(scanned, [SHORT, GOOD])
+
+    def test_duplicates_ignore_whitespace(self):
+        scorer = GdexScorer()
+        result = scorer.generate_examples_streaming("נקודה", [GOOD, GOOD.replace(" ", "  "), SHORT],
+                                                    top_n=3, diversity=False, warmup=1)
+
+        self.assertEqual(result['candidates_seen'], 2)
+
+    def test_configured_cluster_count_passed_through(self):
+        wsd_handler = FakeWsdHandler()
+        GdexScorer(wsd_handler=wsd_handler).generate_examples_streaming("נקודה", [GOOD], n_clusters=2)
+
+        self.assertEqual(wsd_handler.n_clusters, 2)
+
+    def test_heaps_per_sense(self):
+        sentences = [f"{GOOD} משחק {i}" for i in range(5)] + [f"{GOOD} דיון {i}" for i in range(5)]
+        scorer = GdexScorer(wsd_handler=FakeWsdHandler())
+        result = scorer.generate_examples_streaming("נקודה", sentences, top_n=4, warmup=2)
+
+        self.assertEqual(sorted(result['sense_clusters']), [0, 1])
+        self.assertTrue(all(len(sents) == 2 for sents in result['sense_clusters'].values()))
+        self.assertEqual(len(result['examples']), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
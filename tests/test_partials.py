@@ -0,0 +1,162 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+from src.aggregation.partials import (apply_partial, build_partial, corpus_size, load_partial,
+                                      merge_partials, save_partial, sentence_annotations)
+from src.collocations.cooccurrence_extractor import CooccurrenceExtractor
+
+
+SENTENCES = [
+    "הם זכו בנקודה במשחק האחרון",
+    "אין כאן שום דבר",
+    "הבקיעו גול וקיבלו נקודה נוספת",
+    "זו נקודה מעניינת בדיון",
+    "העלה נקודה חשובה בוויכוח",
+    "הקבוצה צברה עוד נקודה בטבלה",
+    "נקודה חשובה בדיון",
+]
+LEMMAS = ["נקודה", "גול"]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeLemmatizer:
+    """Strips a leading ב/ו so 'בנקודה' tags as 'נקודה'; counts tagging calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def annotate(self, sentence):
+        self.calls += 1
+        words = []
+        for word in sentence.split():
+            lemma = word[1:] if word[0] in "בו" and len(word) > 3 else word
+            words.append((word, lemma, "NOUN"))
+        return [words]
+
+    def get_lemmas_only(self, sentence):
+        return [lemma for words in self.annotate(sentence) for _, lemma, _ in words]
+
+
+def single_machine_state():
+    extractor = CooccurrenceExtractor()
+    for lemma in LEMMAS:
+        matches = extractor.extract_sentences_with_lemma(lemma, SENTENCES)
+        extractor.extract_cooccurrences(lemma, matches)
+        extractor.extract_collocations(lemma, matches)
+    return extractor
+
+
+def shard_partial(start, end):
+    return build_partial(CooccurrenceExtractor(), LEMMAS, SENTENCES[start:end], offset=start)
+
+
+class TestPartials(unittest.TestCase):
+
+    def assertSameState(self, extractor, expected):
+        for lemma in LEMMAS:
+            self.assertEqual(extractor.lemma_sentences[lemma], expected.lemma_sentences[lemma])
+            self.assertEqual(list(extractor.cooccurrences[lemma].items()),
+                             list(expected.cooccurrences[lemma].items()))
+            self.assertEqual(list(extractor.bigrams[lemma].items()),
+                             list(expected.bigrams[lemma].items()))
+            self.assertEqual(extractor.get_top_cooccurrences(lemma, 5),
+                             expected.get_top_cooccurrences(lemma, 5))
+
+    def test_merge_matches_single_machine(self):
+        merged = merge_partials([shard_partial(3, 7), shard_partial(0, 3)])
+        extractor = CooccurrenceExtractor()
+        apply_partial(merged, extractor)
+
+        self.assertSameState(extractor, single_machine_state())
+        self.assertEqual(corpus_size(merged), len(SENTENCES))
+
+    def test_merge_is_associative(self):
+        a, b, c = shard_partial(0, 2), shard_partial(2, 5), shard_partial(5, 7)
+        left = merge_partials([merge_partials([a, b]), c])
+        right = merge_partials([a, merge_partials([b, c])])
+
+        self.assertEqual(left, right)
+
+    def test_round_trip(self):
+        partial = shard_partial(0, 7)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "all.partial.gz")
+            save_partial(partial, path)
+            self.assertEqual(load_partial(path), merge_partials([partial]))
+
+    def test_senses_round_trip(self):
+        partial = merge_partials([shard_partial(0, 7)])
+        partial['senses'] = {"נקודה": [{'sense_id': 0, 'examples': [SENTENCES[0]],
+                                         'collocations': {"משחק": 1}, 'count': 1}]}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "senses.partial.gz")
+            save_partial(partial, path)
+            loaded = load_partial(path)
+
+        self.assertEqual(loaded, partial)
+        self.assertNotIn('senses', merge_partials([loaded]))
+
+    def test_overlapping_ranges_rejected(self):
+        with self.assertRaises(ValueError):
+            merge_partials([shard_partial(0, 4), shard_partial(3, 7)])
+
+    def test_annotations_tagged_once_and_kept_for_matches(self):
+        lemmatizer = FakeLemmatizer()
+        partial = build_partial(CooccurrenceExtractor(), ["נקודה", "נקודה"], SENTENCES[:3],
+                                lemmatizer=lemmatizer)
+
+        self.assertEqual(sorted(partial['lemmas']["נקודה"]['matches']), [0, 2])
+        self.assertEqual(sorted(partial['annotations']), [0, 2])
+        self.assertEqual(lemmatizer.calls, 2)
+
+        expected = CooccurrenceExtractor().extract_sentences_with_lemma("נקודה", SENTENCES[:3],
+                                                                        FakeLemmatizer())
+        self.assertEqual([partial['lemmas']["נקודה"]['matches'][i] for i in [0, 2]], expected)
+
+    def test_annotations_survive_merge_and_round_trip(self):
+        shards = [build_partial(CooccurrenceExtractor(), LEMMAS, SENTENCES[start:end], offset=start,
+                                lemmatizer=FakeLemmatizer())
+                  for start, end in [(0, 4), (4, 7)]]
+        merged = merge_partials(shards)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "merged.partial.gz")
+            save_partial(merged, path)
+            loaded = load_partial(path)
+
+        self.assertEqual(loaded, merged)
+        annotations = sentence_annotations(loaded)
+        self.assertEqual(annotations[SENTENCES[0]][0][2], ["בנקודה", "נקודה", "NOUN"])
+        self.assertNotIn(SENTENCES[1], annotations)
+
+    def test_shards_as_separate_processes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            corpus = os.path.join(tmpdir, "corpus.txt")
+            with open(corpus, 'w', encoding='utf-8') as f:
+                f.write("\n".join(f'{i}\t"{s}"' for i, s in enumerate(SENTENCES, 1)))
+            config = os.path.join(tmpdir, "config.yaml")
+            with open(config, 'w', encoding='utf-8') as f:
+                f.write(f"lemmas: [{', '.join(LEMMAS)}]\n"
+                        f"corpus: {{path: {corpus}, max_lines: null}}\n"
+                        "match: {use_lemmatizer: false}\n")
+
+            script = os.path.join(REPO_ROOT, "src", "distributed.py")
+            parts = [os.path.join(tmpdir, f"{i}.partial.gz") for i in range(3)]
+            workers = [subprocess.Popen([sys.executable, script, "map", "--config", config,
+                                         "--shard", f"{i}/3", "--out", part],
+                                        stdout=subprocess.DEVNULL)
+                       for i, part in enumerate(parts)]
+            self.assertEqual([w.wait() for w in workers], [0, 0, 0])
+
+            merged_path = os.path.join(tmpdir, "merged.partial.gz")
+            subprocess.run([sys.executable, script, "reduce", *parts, "--out", merged_path],
+                           check=True, stdout=subprocess.DEVNULL)
+
+            extractor = CooccurrenceExtractor()
+            apply_partial(load_partial(merged_path), extractor)
+            self.assertSameState(extractor, single_machine_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import tempfile
+from src.pipeline.checkpoints import CheckpointStore
+from src.pipeline.config import load_pipeline_config, resolve_config
+from src.pipeline.runner import Pipeline, Stage
+from src.pipeline.stages import StageContext, dedupe_stage
+
+
+class FakeContext:
+
+    def __init__(self, scale):
+        self.scale = scale
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(self.tmpdir.name)
+        self.calls = []
+
+        def load(ctx):
+            self.calls.append('load')
+            return [1, 2, 3]
+
+        def score(ctx, values):
+            self.calls.append('score')
+            return [v * ctx.scale for v in values]
+
+        self.pipeline = Pipeline([
+            Stage('load', load),
+            Stage('score', score, inputs=['load'], params=lambda ctx: {'scale': ctx.scale}),
+        ], store=self.store, verbose=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rerun_restores_from_checkpoints(self):
+        first = self.pipeline.run(FakeContext(2))
+        second = self.pipeline.run(FakeContext(2))
+
+        self.assertEqual(first['score'], [2, 4, 6])
+        self.assertEqual(second['score'], [2, 4, 6])
+        self.assertEqual(self.calls, ['load', 'score'])
+
+    def test_changed_params_resume_from_stage(self):
+        self.pipeline.run(FakeContext(2))
+        results = self.pipeline.run(FakeContext(3))
+
+        self.assertEqual(results['score'], [3, 6, 9])
+        self.assertEqual(self.calls, ['load', 'score', 'score'])
+        self.assertEqual(self.pipeline.status, {'load': 'cached', 'score': 'ran'})
+
+    def test_preloaded_results_are_not_recomputed(self):
+        loaded = self.pipeline.run(FakeContext(2), targets=['load'])
+        results = self.pipeline.run(FakeContext(3), preloaded=loaded)
+
+        self.assertEqual(results['score'], [3, 6, 9])
+        self.assertEqual(self.calls, ['load', 'score'])
+        self.assertEqual(self.pipeline.status, {'load': 'preloaded', 'score': 'ran'})
+
+    def test_parallel_independent_stages(self):
+        pipeline = Pipeline([
+            Stage('load', lambda ctx: [1, 2, 3]),
+            Stage('total', lambda ctx, values: sum(values), inputs=['load']),
+            Stage('largest', lambda ctx, values: max(values), inputs=['load']),
+            Stage('report', lambda ctx, total, largest: (total, largest), inputs=['total', 'largest']),
+        ], verbose=False, parallel=True)
+        results = pipeline.run(FakeContext(1))
+
+        self.assertEqual(results['report'], (6, 3))
+        self.assertEqual(set(pipeline.status.values()), {'ran'})
+
+    def test_unknown_input_rejected(self):
+        with self.assertRaises(ValueError):
+            Pipeline([Stage('score', lambda ctx, x: x, inputs=['load'])])
+
+    def test_dedupe_ignores_whitespace(self):
+        matched = {'corpus_size': 3, 'matches': ["נקודה חשובה", "נקודה  חשובה", "נקודה אחרת"]}
+        deduped = dedupe_stage(StageContext("נקודה", {}, None), matched)
+
+        self.assertEqual(deduped['matches'], ["נקודה חשובה", "נקודה אחרת"])
+        self.assertEqual(deduped['corpus_size'], 3)
+
+    def test_resolve_config_merges_overrides(self):
+        config = resolve_config({'lemma': 'שלום', 'score': {'num_examples': 5}})
+
+        self.assertEqual(config['lemmas'], ['שלום'])
+        self.assertEqual(config['score']['num_examples'], 5)
+        self.assertTrue(config['score']['diversity'])
+
+    def test_explicit_missing_config_rejected(self):
+        with self.assertRaises(FileNotFoundError):
+            load_pipeline_config('config/missing.yaml')
+
+
+if __name__ == '__main__':
+    unittest.main()
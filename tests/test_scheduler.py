@@ -0,0 +1,118 @@
+import unittest
+import operator
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+from src.pipeline.scheduler import Task, TaskScheduler, _shared_cache
+
+
+def diamond():
+    return {
+        'a': Task(operator.add, (1, 2)),
+        'b': Task(operator.mul, (10,), deps=['a']),
+        'c': Task(operator.add, (100,), deps=['a']),
+        'd': Task(operator.add, deps=['b', 'c']),
+    }
+
+
+class TestTaskScheduler(unittest.TestCase):
+
+    def test_inline_dependencies(self):
+        with TaskScheduler(cores=1) as scheduler:
+            results = scheduler.run(diamond())
+
+        self.assertFalse(scheduler.parallel)
+        self.assertEqual(results, {'a': 3, 'b': 30, 'c': 103, 'd': 133})
+
+    def test_process_pool_dependencies(self):
+        with TaskScheduler(cores=2) as scheduler:
+            results = scheduler.run(diamond())
+            self.assertEqual(scheduler._available, 2)
+
+        self.assertEqual(results['d'], 133)
+
+    def test_map_preserves_order(self):
+        with TaskScheduler(cores=2) as scheduler:
+            results = scheduler.map(operator.mul, [(i, i) for i in range(10)])
+
+        self.assertEqual(results, [i * i for i in range(10)])
+
+    def test_shared_data(self):
+        with TaskScheduler(cores=2) as scheduler:
+            shared = scheduler.share(["נקודה", "שלום"])
+            results = scheduler.map(operator.methodcaller('get'), [(shared,), (shared,)])
+
+        self.assertEqual(results, [["נקודה", "שלום"], ["נקודה", "שלום"]])
+
+    def test_unshare_releases_value(self):
+        with TaskScheduler(cores=1) as scheduler:
+            shared = scheduler.share([1, 2, 3])
+            self.assertEqual(shared.get(), [1, 2, 3])
+            scheduler.unshare(shared)
+
+            self.assertFalse(os.path.exists(shared.path))
+            self.assertNotIn(shared.path, _shared_cache)
+
+    def test_released_values_evicted_on_next_load(self):
+        # Workers cannot be told about unshare; they notice the deleted file.
+        with TaskScheduler(cores=1) as scheduler:
+            first = scheduler.share("first")
+            first.get()
+            os.remove(first.path)
+            second = scheduler.share("second")
+
+            self.assertEqual(second.get(), "second")
+            self.assertNotIn(first.path, _shared_cache)
+            scheduler.unshare(second)
+
+    def test_concurrent_threads_share_one_pool_and_tmpdir(self):
+        scheduler = TaskScheduler(cores=2)
+        barrier = threading.Barrier(8)
+        results, shared = [], []
+
+        def worker(i):
+            barrier.wait()
+            shared.append(scheduler.share(i))
+            results.append(scheduler.submit(operator.neg, i).result())
+
+        with mock.patch('src.pipeline.scheduler.ProcessPoolExecutor',
+                        side_effect=ProcessPoolExecutor) as pools:
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            scheduler.close()
+
+        self.assertEqual(pools.call_count, 1)
+        self.assertEqual(sorted(results), sorted(-i for i in range(8)))
+        tmpdirs = {os.path.dirname(handle.path) for handle in shared}
+        self.assertEqual(len(tmpdirs), 1)
+        self.assertFalse(os.path.exists(tmpdirs.pop()))
+
+    def test_reserve_holds_budget(self):
+        with TaskScheduler(cores=3) as scheduler:
+            with scheduler.reserve(2):
+                self.assertEqual(scheduler._available, 1)
+                self.assertEqual(scheduler.map(operator.neg, [(1,), (2,)]), [-1, -2])
+            self.assertEqual(scheduler._available, 3)
+
+    def test_unknown_dependency_rejected(self):
+        with TaskScheduler(cores=1) as scheduler:
+            with self.assertRaises(ValueError):
+                scheduler.run({'a': Task(operator.neg, (1,), deps=['missing'])})
+
+    def test_cycle_rejected(self):
+        with TaskScheduler(cores=2) as scheduler:
+            with self.assertRaises(ValueError):
+                scheduler.run({'a': Task(operator.neg, deps=['b']), 'b': Task(operator.neg, deps=['a'])})
+
+    def test_task_errors_propagate(self):
+        with TaskScheduler(cores=2) as scheduler:
+            with self.assertRaises(ZeroDivisionError):
+                scheduler.run({'a': Task(operator.truediv, (1, 0))})
+
+
+if __name__ == '__main__':
+    unittest.main()
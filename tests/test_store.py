@@ -0,0 +1,45 @@
+import unittest
+import os
+import tempfile
+from src.lookup.gdex_store import GdexStore, compile_store
+from tests.records import make_record
+
+
+class TestGdexStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "gdex_store.sqlite")
+        compile_store([
+            make_record("נקודה"),
+            make_record("שלום"),
+            make_record("נקודה", "20250102_120000"),
+        ], self.path)
+        self.store = GdexStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_lookup(self):
+        entry = self.store.get("נקודה")
+
+        self.assertEqual(entry["timestamp"], "20250102_120000")
+        self.assertEqual(len(self.store), 2)
+        self.assertIn("שלום", self.store)
+        self.assertIsNone(self.store.get("ספר"))
+
+    def test_accessors(self):
+        self.assertEqual(len(self.store.examples("נקודה")), 2)
+        self.assertEqual(self.store.examples("נקודה", sense_cluster=1)[0]["sentence"], "זו נקודה חשובה בדיון.")
+        self.assertEqual(self.store.collocations("נקודה", 0), {"משחק": 2})
+        self.assertEqual(self.store.cooccurrences("נקודה"), {"חשובה": 2})
+        self.assertEqual(self.store.examples("ספר"), [])
+
+    def test_store_is_read_only(self):
+        with self.assertRaises(Exception):
+            self.store.conn.execute("DELETE FROM entries")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import json
+import os
+import tempfile
+from src.writers.legacy import LegacyWriter, render_text, to_legacy_json
+from src.writers.sharded import ShardedRecordSink, iter_records, load_records, read_manifest
+from tests.records import make_record
+
+
+class TestShardedRecordSink(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rotation_and_manifest(self):
+        with ShardedRecordSink(self.directory, records_per_shard=2) as sink:
+            for lemma in ["נקודה", "שלום", "ספר"]:
+                sink.write(make_record(lemma))
+
+        manifest = read_manifest(self.directory)
+        self.assertEqual([s['file'] for s in manifest['shards']],
+                         ["part-00000.jsonl", "part-00001.jsonl"])
+        self.assertEqual([s['records'] for s in manifest['shards']], [2, 1])
+        self.assertFalse([n for n in os.listdir(self.directory) if n.endswith('.part')])
+
+    def test_uncommitted_shard_is_invisible(self):
+        sink = ShardedRecordSink(self.directory, records_per_shard=10)
+        path = sink.write(make_record("נקודה"))
+
+        self.assertTrue(path.endswith('.part'))
+        self.assertEqual(list(iter_records(self.directory)), [])
+        sink.close()
+        self.assertEqual(len(list(iter_records(self.directory))), 1)
+
+    def test_reopen_appends_and_latest_wins(self):
+        with ShardedRecordSink(self.directory) as sink:
+            sink.write(make_record("נקודה", "20250101_120000"))
+        with ShardedRecordSink(self.directory) as sink:
+            sink.write(make_record("נקודה", "20250102_120000"))
+
+        records = load_records(self.directory, ["נקודה"])
+        self.assertEqual(records["נקודה"]["timestamp"], "20250102_120000")
+        self.assertEqual(len(read_manifest(self.directory)['shards']), 2)
+
+    def test_reopen_recovers_interrupted_shard(self):
+        sink = ShardedRecordSink(self.directory, records_per_shard=10)
+        sink.write(make_record("נקודה"))
+        sink.write(make_record("שלום"))
+        sink._file.write('{"lemma": "ספ')
+        sink._file.close()
+        sink._dir_lock.close()  # the process died: the OS drops its lock
+
+        with ShardedRecordSink(self.directory) as sink:
+            sink.write(make_record("ספר"))
+
+        manifest = read_manifest(self.directory)
+        self.assertEqual([s['lemmas'] for s in manifest['shards']], [["נקודה", "שלום"], ["ספר"]])
+        self.assertEqual(sorted(load_records(self.directory)), ["נקודה", "ספר", "שלום"])
+        self.assertFalse([n for n in os.listdir(self.directory) if n.endswith('.part')])
+
+    def test_single_writer_per_directory(self):
+        with ShardedRecordSink(self.directory) as sink:
+            sink.write(make_record("נקודה"))
+            with self.assertRaises(RuntimeError):
+                ShardedRecordSink(self.directory)
+            sink.write(make_record("שלום"))
+
+        self.assertEqual(read_manifest(self.directory)['shards'][0]['lemmas'], ["נקודה", "שלום"])
+        with ShardedRecordSink(self.directory) as sink:
+            sink.write(make_record("ספר"))
+        self.assertEqual(len(read_manifest(self.directory)['shards']), 2)
+
+    def test_records_are_compact(self):
+        with ShardedRecordSink(self.directory) as sink:
+            sink.write(make_record("נקודה"))
+
+        with open(os.path.join(self.directory, "part-00000.jsonl"), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertNotIn(", ", lines[0])
+        self.assertIn("נקודה", lines[0])
+
+
+class TestLegacyWriter(unittest.TestCase):
+
+    def test_json_matches_legacy_layout(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            output_file = LegacyWriter(output_dir).write(make_record("נקודה"))
+            with open(output_file, encoding='utf-8') as f:
+                results = json.load(f)
+
+            self.assertEqual(results, to_legacy_json(make_record("נקודה")))
+            self.assertNotIn("sentences", results["clusters"]["0"])
+            self.assertTrue(os.path.exists(output_file[:-len('.json')] + '.txt'))
+
+    def test_render_text(self):
+        text = render_text(make_record("נקודה"))
+
+        self.assertIn("תוצאות GDEX עבור: נקודה", text)
+        self.assertIn("נוצר ב: 01/01/2025 12:00", text)
+        self.assertIn("1. הקבוצה צברה נקודה במשחק.", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -52,6 +52,17 @@ class TestWsdHandler(unittest.TestCase):
         self.assertIn("במשחק", patterns)
         self.assertGreater(patterns["במשחק"], 0)
 
+    def test_collocations_from_stored_annotations(self):
+        sentence = "הם זכו בנקודה במשחק"
+        annotations = {sentence: [[("הם", "הם", "PRON"), ("זכו", "זכה", "VERB"),
+                                   ("ב", "ב", "ADP"), ("נקודה", "נקודה", "NOUN"),
+                                   ("ב", "ב", "ADP"), ("משחק", "משחק", "NOUN")]]}
+        patterns = self.wsd.extract_collocational_patterns("נקודה", [sentence], window=2,
+                                                           annotations=annotations)
+
+        self.assertEqual(patterns, {"זכה": 1, "משחק": 1})
+        self.assertIsNone(self.wsd.nlp)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file